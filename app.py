@@ -1,7 +1,13 @@
+import sys
+
 from app_logic import FaceBlurAndScaleApp
 
 if __name__ == "__main__":
     print("Starting Gaussian Blur and Face Scaling Application")
     print("Feature: All faces extracted with small arrow navigation buttons")
     print("All output frames are perfectly aligned horizontally")
-    app = FaceBlurAndScaleApp()
\ No newline at end of file
+    # An optional folder argument opens a folder session with next/previous navigation,
+    # and --blur-only skips face detection and never loads MTCNN
+    args = [arg for arg in sys.argv[1:] if arg != "--blur-only"]
+    app = FaceBlurAndScaleApp(args[0] if args else None, blur_only="--blur-only" in sys.argv[1:])
+    app.run()
\ No newline at end of file
@@ -1,87 +1,306 @@
 import cv2
+import copy
 import numpy as np
 import math
+import threading
 from tkinter import Tk, messagebox, Toplevel
-from PIL import Image, ImageTk
 
+from batch_processor import collect_inputs
 from face_detector import FaceDetector
 from image_processor import ImageProcessor
+from buffer_pool import BufferPool
+from display_adapter import DisplayAdapter
+from tile_pyramid import TilePyramid
+from contact_sheet import ContactSheet
+from event_scheduler import LatestWinsScheduler
 from gui_builder import GUIBuilder
+from prefetch import ImagePrefetcher, PreparedImage
+from settings import (BLUR_STAGES, CASCADE_BLUR, DEFAULT_BLUR_STAGE, IMAGE_DISPLAY_SIZE, FACE_DISPLAY_SIZE,
+                      MEMORY_BUDGET_MB, PREFETCH_AHEAD, PREFETCH_BLUR_ENGINE, PREFETCH_MEMORY_MB)
 
 
 class FaceBlurAndScaleApp:
-    def __init__(self):
+    """One GUI session over any number of images
+    
+    The Tk root, the MTCNN detector, the processors, the buffer pool and the
+    blur scheduler are created once and live as long as the session. Opening
+    another image only replaces the per-image state set up by reset_image_state,
+    so switching images costs decoding and processing, not model start-up.
+    
+    Given a folder, the session steps through its images with next and
+    previous while an ImagePrefetcher decodes, detects and blurs the following
+    ones in the background, so moving on is usually instant.
+    
+    With ``blur_only`` no faces are detected: MTCNN is never imported, images
+    without faces open like any other, the face pane stays empty and mosaic
+    stages cover the whole image.
+    """
+    
+    def __init__(self, folder=None, blur_only=False):
         self.root = Tk()
         self.root.withdraw()  # Hide main window
+        self.main_window = None
         
         # Initialize components
-        self.face_detector = FaceDetector()
+        self.blur_only = blur_only
+        # Created on first detection, so blur-only sessions never load MTCNN
+        self.face_detector = None
+        # The prefetch thread and the Tk thread share the detector
+        self.detect_lock = threading.Lock()
         self.image_processor = ImageProcessor()
+        self.buffer_pool = BufferPool()
+        # Pools are not thread-safe, so background blurs get their own
+        self.blur_pool = BufferPool()
+        self.display_adapter = DisplayAdapter(self.image_processor, self.buffer_pool)
         self.gui_builder = GUIBuilder(self)
+        # Slider drags are debounced and only the newest stage is blurred, off the Tk thread
+        self.blur_scheduler = LatestWinsScheduler(self.root, self.compute_blur_stage_in_background,
+                                                  self.finish_blur_stage, snapshot=self.blur_inputs)
         
         # Image variables
-        self.original_image = None
-        self.blurred_image = None
-        self.face_image = None
-        self.resized_face_image = None
-        self.faces = []
-        self.extracted_faces = []
-        self.current_face_index = 0
+        self.reset_image_state()
         
         # Blur settings - 3 stages
-        self.blur_stages = [
-            {"name": "Light Blur", "kernel": 25, "sigma": 10, "color": "#4CAF50", "slider_value": 0},
-            {"name": "Medium Blur", "kernel": 55, "sigma": 25, "color": "#FF9800", "slider_value": 50},
-            {"name": "Heavy Blur", "kernel": 101, "sigma": 50, "color": "#F44336", "slider_value": 100}
-        ]
-        self.current_blur_stage = 1
+        self.blur_stages = copy.deepcopy(BLUR_STAGES)
+        if blur_only:
+            # Without face boxes a mosaic can only cover the whole image
+            for stage in self.blur_stages:
+                if self.image_processor.stage_uses_faces(stage):
+                    stage['region'] = "image"
+        self.current_blur_stage = DEFAULT_BLUR_STAGE
+        self.requested_blur_stage = self.current_blur_stage
+        # Derive stages from the nearest already-blurred lower stage when possible
+        self.cascade_blur = CASCADE_BLUR
+        # Blurs whose scratch memory would exceed this many bytes run in row bands
+        self.memory_budget = None if MEMORY_BUDGET_MB is None else MEMORY_BUDGET_MB * 2 ** 20
         
         # Image display settings
-        self.image_display_size = (400, 400)
-        self.face_display_size = (400, 400)
+        self.image_display_size = IMAGE_DISPLAY_SIZE
+        self.face_display_size = FACE_DISPLAY_SIZE
+        # Level the eyes using the MTCNN keypoints when extracting faces
+        self.align_faces = False
+        
+        # Zoom and pan of the original and blurred panes
+        self.max_view_zoom = 8.0
+        
+        # Folder session: the prefetcher over the folder's images and the shown index
+        self.prefetcher = None
+        self.folder_index = None
+        # Image being waited for while paging, checked every folder_poll_ms from the Tk thread
+        self.folder_target = None
+        self.folder_step = 1
+        self.folder_poll = None
+        self.folder_poll_ms = 30
         
         # Load image
-        self.load_image()
+        if not (self.open_folder(folder) if folder else self.load_image()):
+            self.close()
+            return
         
         # Create GUI
         self.create_gui()
     
-    def load_image(self):
-        """Load image from file dialog"""
+    def reset_image_state(self):
+        """Clear everything derived from the current image, keeping the session components"""
+        self.original_image = None
+        self.blurred_image = None
+        self.face_image = None
+        self.resized_face_image = None
+        self.faces = []
+        self.extracted_faces = []
+        self.current_face_index = 0
+        self.blur_cache = {}
+        # None means letterboxed fit
+        self.view_zoom = None
+        self.view_center = None
+        self.pyramids = {}
+    
+    def run(self):
+        """Run the Tk event loop until the main window is closed"""
+        if self.main_window is not None:
+            self.root.mainloop()
+    
+    def close(self):
+        """End the session: stop the blur worker and destroy the Tk root"""
+        self.blur_scheduler.shutdown()
+        self.stop_folder_navigation()
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+        self.root.destroy()
+    
+    def get_face_detector(self):
+        """Create the MTCNN detector on first use; call with detect_lock held"""
+        if self.face_detector is None:
+            self.face_detector = FaceDetector()
+        return self.face_detector
+    
+    def ask_image_path(self):
+        """Ask for an image file; returns an empty value if the dialog is cancelled"""
         from tkinter import filedialog
         
-        file_path = filedialog.askopenfilename(
+        return filedialog.askopenfilename(
             title="Select an Image with Face",
             filetypes=[("Image Files", "*.jpg;*.jpeg;*.png;*.bmp")]
         )
-        
+    
+    def load_image(self):
+        """Load image from file dialog"""
+        file_path = self.ask_image_path()
         if not file_path:
             messagebox.showerror("Error", "No image selected!")
-            self.root.quit()
-            return
-        
-        self.original_image = cv2.imread(file_path)
-        if self.original_image is None:
-            messagebox.showerror("Error", "Could not load image!")
-            self.root.quit()
-            return
-        
-        self.detect_faces()
+            return False
         
+        return self.open_image(file_path)
+    
+    def open_image(self, file_path):
+        """Decode an image and make it current, leaving the current image untouched on failure"""
+        return self.show_prepared(self.prepare_image(file_path))
+    
+    def prepare_image(self, file_path, blur_stage=None):
+        """Decode and detect faces, and blur at blur_stage if given; touches no Tk or session state"""
+        image = cv2.imread(file_path)
+        if image is None:
+            return PreparedImage(file_path, error="Could not load image!")
+        
+        faces = []
+        if not self.blur_only:
+            try:
+                with self.detect_lock:
+                    faces = self.get_face_detector().find_faces(image)
+            except Exception as e:
+                print(f"Face detection error: {e}")
+        if not faces and not self.blur_only:
+            return PreparedImage(file_path, image, error="No faces detected in the image!")
+        
+        blurred = None
+        if blur_stage is not None:
+            # A fresh output, since the pooled stage buffers belong to the current image. The
+            # manual engine would hold the GIL for minutes and stall the window meanwhile
+            stage = dict(self.blur_stages[blur_stage], engine=PREFETCH_BLUR_ENGINE)
+            blurred = self.image_processor.apply_stage(image, stage, faces, memory_budget=self.memory_budget)
+        return PreparedImage(file_path, image, faces, blur_stage, blurred)
+    
+    def show_prepared(self, prepared, quiet=False):
+        """Make a prepared image current; a failed one is reported and leaves the current image in place"""
+        if prepared.error is not None:
+            if quiet:
+                print(f"Skipping {prepared.path}: {prepared.error}")
+            elif prepared.image is None:
+                messagebox.showerror("Error", prepared.error)
+            else:
+                messagebox.showinfo("No Face", prepared.error)
+            return False
+        if not self.blur_only:
+            print(f"Detected {len(prepared.faces)} face(s)")
+        
+        # A blur still running for the previous image is left to finish and its result dropped
+        self.blur_scheduler.cancel()
+        self.requested_blur_stage = self.current_blur_stage
+        
+        self.reset_image_state()
+        self.original_image = prepared.image
+        self.faces = prepared.faces
+        if prepared.blurred is not None:
+            self.blur_cache[prepared.blur_stage] = prepared.blurred
         if self.faces:
             self.extract_all_faces()
             self.extract_face()
             self.resize_face_to_display()
-        else:
-            messagebox.showinfo("No Face", "No faces detected in the image!")
-            self.root.quit()
+        self.apply_blur()
+        return True
+    
+    def open_folder(self, directory=None):
+        """Start a folder session at the folder's first image with faces"""
+        if directory is None:
+            from tkinter import filedialog
+            directory = filedialog.askdirectory(title="Select a Folder of Images")
+            if not directory:
+                return False
+        
+        prefetcher = ImagePrefetcher(collect_inputs([directory]), self.prepare_image,
+                                     PREFETCH_AHEAD, PREFETCH_MEMORY_MB * 2 ** 20)
+        index = self.show_folder_image(prefetcher, 0, 1)
+        if index is None:
+            prefetcher.close()
+            messagebox.showerror("Error", "No image with faces in the folder!")
+            return False
+        
+        self.stop_folder_navigation()
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+        self.prefetcher = prefetcher
+        self.folder_index = index
+        return True
+    
+    def show_folder_image(self, prefetcher, index, step):
+        """Show the first image with faces from index on in direction step; returns its index or None"""
+        while 0 <= index < len(prefetcher.paths):
+            prepared = prefetcher.get(index, self.current_blur_stage)
+            # Start on the following images before building the panes of this one
+            prefetcher.schedule(index, self.current_blur_stage)
+            if self.show_prepared(prepared, quiet=True):
+                return index
+            index += step
+        return None
+    
+    def navigate_images(self, direction):
+        """Move to the next or previous image with faces of the folder session, without blocking the window
+        
+        The image is shown once the prefetcher has it ready, checked with after
+        like the blur scheduler does; pressing again meanwhile moves on from the
+        image being waited for.
+        """
+        if self.prefetcher is None:
             return
         
-        self.apply_blur()
+        self.folder_step = 1 if direction == "next" else -1
+        start = self.folder_index if self.folder_target is None else self.folder_target
+        self.folder_target = start + self.folder_step
+        if self.folder_poll is None:
+            self.poll_folder_image()
+    
+    def poll_folder_image(self):
+        """Show the image being waited for if it is ready, skipping images without faces, or check again later"""
+        self.folder_poll = None
+        while self.folder_target is not None:
+            index = self.folder_target
+            if not 0 <= index < len(self.prefetcher.paths):
+                print("No more images with faces in that direction")
+                self.folder_target = None
+                self.update_folder_label(self.folder_index)
+                return
+            
+            prepared = self.prefetcher.get(index, self.current_blur_stage, wait=False)
+            self.prefetcher.schedule(index, self.current_blur_stage)
+            if prepared is None:
+                self.update_folder_label(index, loading=True)
+                self.folder_poll = self.root.after(self.folder_poll_ms, self.poll_folder_image)
+                return
+            
+            if self.show_prepared(prepared, quiet=True):
+                self.folder_index = index
+                self.folder_target = None
+                self.rebuild_main_window()
+                return
+            self.folder_target = index + self.folder_step
+    
+    def stop_folder_navigation(self):
+        """Stop waiting for a folder image"""
+        if self.folder_poll is not None:
+            self.root.after_cancel(self.folder_poll)
+            self.folder_poll = None
+        self.folder_target = None
+    
+    def update_folder_label(self, index, loading=False):
+        """Show which folder image is shown, or being prepared, under the images"""
+        if hasattr(self, 'folder_label') and self.folder_label.winfo_exists():
+            self.folder_label.config(text=self.gui_builder.folder_label_text(index, loading),
+                                     fg="gray" if loading else "blue")
     
     def detect_faces(self):
         """Detect faces in the image"""
-        return self.face_detector.detect_faces(self.original_image, self)
+        with self.detect_lock:
+            return self.get_face_detector().detect_faces(self.original_image, self)
     
     def extract_all_faces(self):
         """Extract all faces from the image and store them in temporary storage"""
@@ -93,8 +312,9 @@ class FaceBlurAndScaleApp:
         if not self.extracted_faces:
             return
         
+        # Read-only view into the original; resizing only reads it, so nothing is copied
         current_face_data = self.extracted_faces[self.current_face_index]
-        self.face_image = current_face_data['image'].copy()
+        self.face_image = current_face_data.image
         
         print(f"Displaying face {self.current_face_index + 1}/{len(self.extracted_faces)}")
     
@@ -108,11 +328,21 @@ class FaceBlurAndScaleApp:
         elif direction == "prev":
             self.current_face_index = (self.current_face_index - 1) % len(self.extracted_faces)
         
+        self.show_face(self.current_face_index)
+    
+    def show_face(self, index):
+        """Show the face at index in the face pane"""
+        self.current_face_index = index
         self.extract_face()
         self.resize_face_to_display()
         self.update_display()
         self.update_face_navigation_info()
     
+    def open_contact_sheet(self):
+        """Open a scrollable grid of every extracted face"""
+        if self.extracted_faces:
+            self.contact_sheet = ContactSheet(self)
+    
     def update_face_navigation_info(self):
         """Update face navigation information in the GUI"""
         if hasattr(self, 'face_nav_label'):
@@ -126,30 +356,35 @@ class FaceBlurAndScaleApp:
         """Create a Gaussian kernel manually"""
         return self.image_processor.create_gaussian_kernel(kernel_size, sigma)
     
-    def apply_gaussian_blur_manual(self, image, kernel_size, sigma):
+    def apply_gaussian_blur_manual(self, image, kernel_size, sigma, out=None):
         """Apply Gaussian blur using manual convolution"""
-        return self.image_processor.apply_gaussian_blur_manual(image, kernel_size, sigma)
+        return self.image_processor.apply_gaussian_blur_manual(
+            image, kernel_size, sigma, out=out, pool=self.buffer_pool)
     
-    def manual_resize_bicubic(self, image, target_size):
+    def manual_resize_bicubic(self, image, target_size, out=None):
         """Manual bicubic interpolation for image resizing"""
-        return self.image_processor.manual_resize_bicubic(image, target_size)
+        return self.image_processor.manual_resize_bicubic(
+            image, target_size, out=out, pool=self.buffer_pool)
     
     def resize_face_to_display(self):
-        """Resize face image to fit display frame using manual bicubic interpolation"""
+        """Resample the face being shown straight from the original, at display size"""
         if self.face_image is None:
             return
         
+        # Only this face is resampled, so loading an image costs the same however many faces it has
         target_width, target_height = self.face_display_size
-        self.resized_face_image = self.manual_resize_bicubic(
-            self.face_image, 
-            (target_width, target_height)
-        )
+        face = self.faces[self.extracted_faces[self.current_face_index].index]
+        self.resized_face_image = FaceDetector.extract_faces_fused(
+            self.original_image, [face], self.face_display_size, align=self.align_faces,
+            out=self.buffer_pool.get("face_display", (1, target_height, target_width, 3)))[0]
         
         print(f"Face resized to: {target_width}x{target_height} pixels")
     
-    def apply_gaussian_blur(self, image, kernel_size, sigma):
-        """Apply Gaussian blur using manual implementation"""
-        blurred = self.apply_gaussian_blur_manual(image, kernel_size, sigma)
+    def apply_gaussian_blur(self, image, kernel_size, sigma, out=None, engine="manual", pool=None):
+        """Apply Gaussian blur using the selected manual implementation"""
+        blurred = self.image_processor.apply_gaussian_blur(
+            image, kernel_size, sigma, engine=engine, out=out, pool=self.buffer_pool if pool is None else pool,
+            memory_budget=self.memory_budget)
         return blurred
     
     def apply_blur(self):
@@ -157,65 +392,210 @@ class FaceBlurAndScaleApp:
         if self.original_image is None:
             return
         
-        stage = self.blur_stages[self.current_blur_stage]
-        print(f"Applying {stage['name']}: Kernel={stage['kernel']}, Sigma={stage['sigma']}")
+        self.blurred_image = self.compute_blur_stage(self.current_blur_stage, self.blur_inputs(), self.buffer_pool)
+        self.blur_cache[self.current_blur_stage] = self.blurred_image
+    
+    def blur_inputs(self):
+        """The image, faces and blurred stages a stage is computed from, taken on the Tk thread"""
+        return self.original_image, self.faces, dict(self.blur_cache)
+    
+    def find_cascade_base(self, stage_index, blur_cache):
+        """Find the nearest already-blurred lower stage and the residual blur that reaches stage_index"""
+        stage = self.blur_stages[stage_index]
+        if not self.cascade_blur or self.image_processor.stage_uses_faces(stage):
+            return None
+        
+        # Mosaic stages are no Gaussian, so they are never a starting point
+        lower = [i for i in blur_cache if not self.image_processor.stage_uses_faces(self.blur_stages[i])
+                 and self.blur_stages[i]['sigma'] < stage['sigma']]
+        
+        for base_index in sorted(lower, key=lambda i: self.blur_stages[i]['sigma'], reverse=True):
+            base = self.blur_stages[base_index]
+            residual = self.image_processor.residual_blur_params(
+                base['kernel'], base['sigma'], stage['kernel'], stage['sigma'])
+            if residual is not None and residual[2] <= self.image_processor.CASCADE_TOLERANCE:
+                return base_index, residual
+        
+        return None
+    
+    def compute_blur_stage_in_background(self, stage_index, inputs):
+        """compute_blur_stage on the scheduler's worker, with the worker's own buffer pool
         
-        self.blurred_image = self.apply_gaussian_blur(
-            self.original_image.copy(), 
-            stage['kernel'], 
-            stage['sigma']
+        Returns (image, blurred), so finish_blur_stage can tell a result for an
+        image that has since been replaced.
+        """
+        return inputs[0], self.compute_blur_stage(stage_index, inputs, self.blur_pool)
+    
+    def compute_blur_stage(self, stage_index, inputs, pool):
+        """Blur an image for a stage, reusing cached stages as the starting point
+        
+        ``inputs`` comes from blur_inputs and ``pool`` belongs to the calling
+        thread; no session state is read or written, so the caller stores the
+        result in blur_cache.
+        """
+        image, faces, blur_cache = inputs
+        if stage_index in blur_cache:
+            return blur_cache[stage_index]
+        
+        stage = self.blur_stages[stage_index]
+        if self.image_processor.stage_uses_faces(stage):
+            print(f"Applying {stage['name']}: {stage['blocks']} blocks per face over the {stage.get('region', 'faces')}")
+            return self.image_processor.apply_stage(
+                image, stage, faces, out=pool.get(f"blurred.{stage_index}", image.shape))
+        
+        engine = stage.get('engine', 'manual')
+        source, kernel_size, sigma = image, stage['kernel'], stage['sigma']
+        
+        cascade = self.find_cascade_base(stage_index, blur_cache)
+        if cascade is not None:
+            base_index, (kernel_size, sigma, max_error) = cascade
+            source = blur_cache[base_index]
+            print(f"Applying {stage['name']} from {self.blur_stages[base_index]['name']}: "
+                  f"Kernel={kernel_size}, Sigma={sigma:.2f}, Engine={engine}, Max error={max_error:.1f}")
+        else:
+            print(f"Applying {stage['name']}: Kernel={kernel_size}, Sigma={sigma}, Engine={engine}")
+        
+        # The blur never writes to its input, so the original is passed without a copy
+        return self.apply_gaussian_blur(
+            source, 
+            kernel_size, 
+            sigma,
+            out=pool.get(f"blurred.{stage_index}", image.shape),
+            engine=engine,
+            pool=pool
         )
     
     def update_blur_from_slider(self, value):
-        """Update blur based on slider value (3 distinct stages)"""
+        """Update blur based on slider value, snapping to the stage with the nearest slider_value"""
         slider_val = int(float(value))
-        
-        if slider_val <= 25:
-            new_stage = 0
-            self.slider.set(0)
-        elif slider_val <= 75:
-            new_stage = 1
-            self.slider.set(50)
-        else:
-            new_stage = 2
-            self.slider.set(100)
-        
-        if new_stage != self.current_blur_stage:
-            self.current_blur_stage = new_stage
-            self.apply_blur()
-            self.update_display()
-            self.update_blur_info()
-            self.update_stage_indicators()
+        new_stage = min(range(len(self.blur_stages)),
+                        key=lambda i: abs(self.blur_stages[i]['slider_value'] - slider_val))
+        
+        # Snapping fires this handler again with the snapped value; that call finds
+        # the stage already requested and returns without scheduling anything
+        snapped_value = self.blur_stages[new_stage]['slider_value']
+        if slider_val != snapped_value:
+            self.slider.set(snapped_value)
+        
+        if new_stage != self.requested_blur_stage:
+            self.requested_blur_stage = new_stage
+            self.blur_scheduler.submit(new_stage)
+    
+    def finish_blur_stage(self, stage_index, result):
+        """Cache and show a blur stage computed by the scheduler, dropping one for a replaced image"""
+        image, blurred = result
+        if image is not self.original_image:
+            return
+        self.blur_cache[stage_index] = blurred
+        self.current_blur_stage = stage_index
+        self.blurred_image = blurred
+        self.update_blurred_pane()
+        self.update_blur_info()
+        self.update_stage_indicators()
     
     def update_display(self):
         """Update all three output frames"""
+        self.update_image_panes()
+        
+        if self.resized_face_image is not None:
+            self.face_photo = self.display_adapter.render(
+                "face", self.resized_face_image, self.face_display_size)
+            self.face_label.config(image=self.face_photo)
+    
+    def update_image_panes(self):
+        """Update the original and blurred frames, letterboxed or at the current zoom"""
         if self.original_image is not None:
-            original_rgb = cv2.cvtColor(self.original_image, cv2.COLOR_BGR2RGB)
-            original_resized = self.resize_to_exact_size(original_rgb, self.image_display_size)
-            original_pil = Image.fromarray(original_resized)
-            self.original_photo = ImageTk.PhotoImage(image=original_pil)
+            self.original_photo = self.render_image_pane("original", self.original_image)
             self.original_label.config(image=self.original_photo)
         
+        self.update_blurred_pane()
+    
+    def update_blurred_pane(self):
+        """Update only the blurred frame"""
         if self.blurred_image is not None:
-            blurred_rgb = cv2.cvtColor(self.blurred_image, cv2.COLOR_BGR2RGB)
-            blurred_resized = self.resize_to_exact_size(blurred_rgb, self.image_display_size)
-            blurred_pil = Image.fromarray(blurred_resized)
-            self.blurred_photo = ImageTk.PhotoImage(image=blurred_pil)
+            self.blurred_photo = self.render_image_pane("blurred", self.blurred_image)
             self.blurred_label.config(image=self.blurred_photo)
+    
+    def render_image_pane(self, pane, image):
+        """Render one image pane through the display adapter"""
+        if self.view_zoom is None:
+            return self.display_adapter.render(pane, image, self.image_display_size)
+        
+        pyramid = self.pyramids.get(pane)
+        if pyramid is None or pyramid.image is not image:
+            pyramid = TilePyramid(image)
+            self.pyramids[pane] = pyramid
+        return self.display_adapter.render_view(
+            pane, pyramid, self.view_zoom, self.view_center, self.image_display_size)
+    
+    def fit_zoom(self):
+        """Zoom at which the whole original fits the image pane"""
+        height, width = self.original_image.shape[:2]
+        return min(self.image_display_size[0] / width, self.image_display_size[1] / height)
+    
+    def set_view(self, zoom, center):
+        """Set zoom and centre of the image panes; anything at or below fit shows the letterbox"""
+        if zoom is None or zoom <= self.fit_zoom():
+            self.view_zoom = None
+            self.view_center = None
+        else:
+            height, width = self.original_image.shape[:2]
+            self.view_zoom = min(zoom, self.max_view_zoom)
+            self.view_center = (min(max(center[0], 0), width), min(max(center[1], 0), height))
         
-        if self.resized_face_image is not None:
-            face_rgb = cv2.cvtColor(self.resized_face_image, cv2.COLOR_BGR2RGB)
-            face_pil = Image.fromarray(face_rgb)
-            self.face_photo = ImageTk.PhotoImage(image=face_pil)
-            self.face_label.config(image=self.face_photo)
+        self.update_image_panes()
+        self.update_zoom_info()
+    
+    def zoom_view(self, factor, anchor=None):
+        """Zoom the image panes by a factor, keeping the source point under anchor in place"""
+        if self.original_image is None:
+            return
+        
+        height, width = self.original_image.shape[:2]
+        zoom = self.view_zoom or self.fit_zoom()
+        center = self.view_center or (width / 2, height / 2)
+        new_zoom = min(zoom * factor, self.max_view_zoom)
+        
+        if anchor is not None:
+            offset_x = anchor[0] - self.image_display_size[0] / 2
+            offset_y = anchor[1] - self.image_display_size[1] / 2
+            center = (center[0] + offset_x / zoom - offset_x / new_zoom,
+                      center[1] + offset_y / zoom - offset_y / new_zoom)
+        
+        self.set_view(new_zoom, center)
+    
+    def pan_view(self, dx, dy):
+        """Pan the zoomed image panes by a display-pixel offset"""
+        if self.view_zoom is None:
+            return
+        self.set_view(self.view_zoom, (self.view_center[0] - dx / self.view_zoom,
+                                       self.view_center[1] - dy / self.view_zoom))
+    
+    def toggle_actual_size(self, anchor=None):
+        """Switch between the letterboxed fit and 100% around anchor"""
+        if self.view_zoom is None:
+            self.zoom_view(1.0 / self.fit_zoom(), anchor)
+        else:
+            self.set_view(None, None)
+    
+    def update_zoom_info(self):
+        """Update the zoom indicator under the image panes"""
+        if hasattr(self, 'zoom_label'):
+            if self.view_zoom is None:
+                self.zoom_label.config(text="Zoom: Fit (scroll to zoom, drag to pan, double-click for 100%)")
+            else:
+                self.zoom_label.config(text=f"Zoom: {self.view_zoom * 100:.0f}%")
     
     def update_blur_info(self):
         """Update blur information display"""
         stage = self.blur_stages[self.current_blur_stage]
-        self.blur_info_label.config(
-            text=f"{stage['name']} | Kernel: {stage['kernel']}x{stage['kernel']} | Sigma: {stage['sigma']}",
-            fg=stage['color']
-        )
+        self.blur_info_label.config(text=self.stage_description(stage), fg=stage['color'])
+    
+    def stage_description(self, stage):
+        """One-line summary of a blur stage for the control panel"""
+        if self.image_processor.stage_uses_faces(stage):
+            return f"{stage['name']} | {stage['blocks']} blocks per face | Region: {stage.get('region', 'faces')}"
+        return f"{stage['name']} | Kernel: {stage['kernel']}x{stage['kernel']} | Sigma: {stage['sigma']}"
     
     def update_stage_indicators(self):
         """Update stage indicator colors"""
@@ -227,13 +607,13 @@ class FaceBlurAndScaleApp:
     
     def resize_to_exact_size(self, img, target_size):
         """Resize image to exact target size, maintaining aspect ratio with padding if needed"""
-        return self.image_processor.resize_to_exact_size(img, target_size)
+        return self.image_processor.resize_to_exact_size(img, target_size, pool=self.buffer_pool)
     
     def save_images(self):
         """Save all three output images"""
         from tkinter import filedialog
         
-        if self.blurred_image is None or self.resized_face_image is None:
+        if self.blurred_image is None:
             messagebox.showerror("Error", "No images to save!")
             return
         
@@ -257,11 +637,13 @@ class FaceBlurAndScaleApp:
             cv2.imwrite(blur_path, self.blurred_image)
             print(f"Blurred image saved to: {blur_path}")
         
-        face_path = filedialog.asksaveasfilename(
-            title="Save Resized Face Image",
-            defaultextension=".jpg",
-            filetypes=[("JPEG files", "*.jpg"), ("PNG files", "*.png")]
-        )
+        face_path = None
+        if self.resized_face_image is not None:
+            face_path = filedialog.asksaveasfilename(
+                title="Save Resized Face Image",
+                defaultextension=".jpg",
+                filetypes=[("JPEG files", "*.jpg"), ("PNG files", "*.png")]
+            )
         
         if face_path:
             cv2.imwrite(face_path, self.resized_face_image)
@@ -273,6 +655,12 @@ class FaceBlurAndScaleApp:
     def create_gui(self):
         """Create the main GUI window with perfect alignment using grid"""
         self.main_window = Toplevel(self.root)
+        # The root stays hidden, so closing the main window has to end the session
+        self.main_window.protocol("WM_DELETE_WINDOW", self.close)
+        self.main_window.bind("<Control-o>", lambda e: self.reload_image())
+        self.main_window.bind("<Control-O>", lambda e: self.reload_folder())
+        self.main_window.bind("<Prior>", lambda e: self.navigate_images("prev"))
+        self.main_window.bind("<Next>", lambda e: self.navigate_images("next"))
         self.gui_builder.create_main_window(self.main_window)
     
     def save_current_face(self):
@@ -295,6 +683,27 @@ class FaceBlurAndScaleApp:
             messagebox.showinfo("Success", f"Face {self.current_face_index + 1} saved successfully!")
     
     def reload_image(self):
-        """Reload with a new image"""
-        self.main_window.destroy()
-        self.__init__()
\ No newline at end of file
+        """Open another image in the running session, keeping the current one if the dialog is cancelled"""
+        file_path = self.ask_image_path()
+        if not file_path or not self.open_image(file_path):
+            return
+        
+        # A single image ends the folder session
+        self.stop_folder_navigation()
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+            self.prefetcher = None
+        self.rebuild_main_window()
+    
+    def reload_folder(self):
+        """Start a folder session in the running window, keeping the current image if it fails"""
+        if self.open_folder():
+            self.rebuild_main_window()
+    
+    def rebuild_main_window(self):
+        """Recreate the window's widgets for a newly opened image"""
+        # Pane contents and face navigation depend on the image, so rebuild the
+        # window's widgets (closing any contact sheet) but keep the window itself
+        for child in self.main_window.winfo_children():
+            child.destroy()
+        self.gui_builder.create_main_window(self.main_window)
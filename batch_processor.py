@@ -0,0 +1,395 @@
+import argparse
+import contextlib
+import hashlib
+import os
+import time
+
+import cv2
+
+from buffer_pool import BufferPool
+from dedup import HashIndex, dhash, load_proxy, scale_faces
+from image_processor import ImageProcessor
+from manifest import BatchManifest
+from memory_monitor import StageMemory
+from output_sink import DirectorySink, ShardSink
+from settings import (BLUR_STAGES, DEFAULT_BLUR_STAGE, FACE_DISPLAY_SIZE, HEADLESS_BLUR_ENGINE, IMAGE_EXTENSIONS,
+                      MEMORY_BUDGET_MB)
+
+
+def faces_to_json(faces):
+    """MTCNN face dictionaries as plain JSON-friendly values"""
+    records = []
+    for face in faces:
+        records.append({
+            'box': [int(v) for v in face['box']],
+            'confidence': float(face['confidence']),
+            'keypoints': {name: [float(v) for v in point] for name, point in face.get('keypoints', {}).items()}
+        })
+    return records
+
+
+def collect_inputs(paths):
+    """Expand files and directories into a sorted list of image paths"""
+    inputs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    inputs.append(os.path.join(path, name))
+        else:
+            inputs.append(path)
+    return inputs
+
+
+def output_stem(input_path):
+    """Output name prefix of an input: its base name and a short hash of its absolute path
+    
+    Inputs with the same base name in different folders, or with different
+    extensions, get distinct outputs in a directory and in a shard.
+    """
+    name = os.path.splitext(os.path.basename(input_path))[0]
+    digest = hashlib.sha256(os.path.abspath(input_path).encode("utf-8")).hexdigest()[:8]
+    return f"{name}_{digest}"
+
+
+def parse_sizes(text):
+    """Parse "224,112" into square (w, h) sizes"""
+    return [(int(size), int(size)) for size in filter(None, text.split(","))]
+
+
+def add_job_arguments(parser, archive_help="Stream outputs into tar or zip shards instead of loose files"):
+    """Add the blur, face, memory and archive options shared by the batch, pipeline and watch-folder tools"""
+    parser.add_argument("--stage", type=int, default=DEFAULT_BLUR_STAGE,
+                        help="Blur stage index (0 light, 1 medium, 2 heavy, 3 mosaic)")
+    parser.add_argument("--engine", choices=sorted(ImageProcessor.BLUR_ENGINES), default=HEADLESS_BLUR_ENGINE,
+                        help=f"Blur engine (default: {HEADLESS_BLUR_ENGINE})")
+    parser.add_argument("--region", choices=("faces", "image"),
+                        help="Mosaic region override: the face boxes or the whole image")
+    parser.add_argument("--face-size", type=int, default=FACE_DISPLAY_SIZE[0], help="Face output size in pixels")
+    parser.add_argument("--pyramid", type=parse_sizes, default=[],
+                        help="Smaller face sizes derived from the --face-size faces, e.g. 224,112")
+    parser.add_argument("--align", action="store_true", help="Align faces using the eye keypoints")
+    parser.add_argument("--blur-only", action="store_true",
+                        help="Write only the blurred images, without loading the face detector")
+    parser.add_argument("--memory-budget", type=int, default=MEMORY_BUDGET_MB,
+                        help="Scratch memory budget in MB; larger operations run in bands (0 disables)")
+    parser.add_argument("--archive", choices=ShardSink.FORMATS, help=archive_help)
+    parser.add_argument("--shard-size", type=int, default=1024, help="Shard size limit in MB")
+
+
+def stage_from_args(args):
+    """The blur stage selected by the options of add_job_arguments"""
+    stage = dict(BLUR_STAGES[args.stage], engine=args.engine)
+    if args.region:
+        stage['region'] = args.region
+    return stage
+
+
+def job_options(args):
+    """BatchProcessor keyword arguments from the options of add_job_arguments"""
+    return {
+        'blur_stage': stage_from_args(args),
+        'face_size': (args.face_size, args.face_size),
+        'align_faces': args.align,
+        'face_pyramid': args.pyramid,
+        'blur_only': args.blur_only,
+        'memory_budget': args.memory_budget * 2 ** 20 if args.memory_budget else None,
+    }
+
+
+class BatchProcessor:
+    """Headless blur and face export over many images, resumable through a BatchManifest
+    
+    Each input produces a "blurred" output (the whole image at one blur stage) and
+    a "faces" output (every face resampled to face_size, and to each smaller size
+    in ``face_pyramid`` derived from it). An input is skipped when
+    its latest manifest record succeeded for the same file content and every
+    output still exists with the same parameters. Otherwise only the missing or
+    changed outputs are recomputed, and detections stored in the manifest are
+    reused when only the face parameters changed.
+    
+    ``memory_budget`` (bytes) caps the scratch memory of the blur and face
+    resampling, which switch to banded execution above it. With a StageMemory
+    in ``stage_memory`` the measured peak of every stage is recorded as well.
+    
+    Outputs go through ``sink``: loose files in output_dir by default, or a
+    ShardSink that streams them into tar or zip shards with a JSON index.
+    
+    With a HashIndex in ``dedup_index``, each input is first hashed from a small
+    proxy decode. When an earlier input lies within the index's Hamming distance,
+    its detections are rescaled and reused instead of running MTCNN, and with
+    ``reuse_outputs`` its outputs are recorded for this input without decoding it.
+    
+    With ``blur_only`` only the "blurred" output is produced and no faces are
+    detected, so MTCNN is never imported; a mosaic stage then covers the whole
+    image at a block size taken from the image itself.
+    """
+    
+    def __init__(self, output_dir, blur_stage=None, face_size=FACE_DISPLAY_SIZE, align_faces=False,
+                 manifest_path=None, face_detector=None, memory_budget=None, stage_memory=None, sink=None,
+                 dedup_index=None, reuse_outputs=False, manifest=None, face_pyramid=(), blur_only=False):
+        self.output_dir = output_dir
+        self.blur_stage = dict(blur_stage or dict(BLUR_STAGES[DEFAULT_BLUR_STAGE], engine=HEADLESS_BLUR_ENGINE))
+        self.face_size = tuple(face_size)
+        self.face_pyramid = [tuple(size) for size in face_pyramid]
+        self.align_faces = align_faces
+        self.blur_only = blur_only
+        if blur_only and ImageProcessor.stage_uses_faces(self.blur_stage):
+            self.blur_stage['region'] = "image"
+        self.face_detector = face_detector
+        self.image_processor = ImageProcessor()
+        self.buffer_pool = BufferPool()
+        self.memory_budget = memory_budget
+        self.stage_memory = stage_memory
+        os.makedirs(output_dir, exist_ok=True)
+        self.sink = sink or DirectorySink(output_dir)
+        self.dedup_index = dedup_index
+        self.reuse_outputs = reuse_outputs
+        # Processors running side by side share one manifest, closed by its owner
+        self.owns_manifest = manifest is None
+        self.manifest = manifest or BatchManifest(manifest_path or os.path.join(output_dir, "manifest.jsonl"))
+    
+    def output_params(self):
+        """Parameter fingerprint of every output kind"""
+        stage = self.blur_stage
+        if ImageProcessor.stage_uses_faces(stage):
+            blurred = {'mode': 'mosaic', 'blocks': stage['blocks'], 'region': stage.get('region', 'faces')}
+            if self.blur_only:
+                blurred['detect'] = False  # Blocks sized from the image, not the largest face
+        else:
+            blurred = {'kernel': stage['kernel'], 'sigma': stage['sigma'], 'engine': stage.get('engine', 'manual')}
+        if self.blur_only:
+            return {'blurred': BatchManifest.params_hash(blurred)}
+        faces = {'size': list(self.face_size), 'align': self.align_faces}
+        if self.face_pyramid:
+            faces['pyramid'] = [list(size) for size in self.face_pyramid]
+        return {
+            'blurred': BatchManifest.params_hash(blurred),
+            'faces': BatchManifest.params_hash(faces),
+        }
+    
+    def outputs_to_compute(self, record, content_hash, params):
+        """Names of outputs that are missing, failed, stale or changed for this input"""
+        if record is None or record.get('status') != 'ok' or record.get('hash') != content_hash:
+            return list(params)
+        
+        todo = []
+        for name, params_hash in params.items():
+            output = record.get('outputs', {}).get(name)
+            if output is None or output.get('params') != params_hash or \
+                    not all(self.sink.exists(path) for path in output.get('paths', [])):
+                todo.append(name)
+        return todo
+    
+    def track(self, stage):
+        """Measure a stage's peak memory when a StageMemory is attached"""
+        if self.stage_memory is None:
+            return contextlib.nullcontext()
+        return self.stage_memory.track(stage)
+    
+    def get_face_detector(self):
+        """Create the MTCNN detector on first use, so runs that need no detection never load it"""
+        if self.face_detector is None:
+            from face_detector import FaceDetector
+            self.face_detector = FaceDetector()
+        return self.face_detector
+    
+    def needs_faces(self, todo):
+        """True if an output in todo depends on the detected faces"""
+        if self.blur_only:
+            return False
+        # A mosaic stage pixelates the face boxes, so the blurred output needs them too
+        return 'faces' in todo or ('blurred' in todo and ImageProcessor.stage_uses_faces(self.blur_stage))
+    
+    def process(self, input_path):
+        """Process one input, recomputing only what the manifest says is needed"""
+        content_hash = BatchManifest.content_hash(input_path)
+        record = self.manifest.latest(input_path)
+        params = self.output_params()
+        todo = self.outputs_to_compute(record, content_hash, params)
+        
+        if not todo:
+            print(f"Skipping {input_path}: already done")
+            return False
+        
+        same_content = record is not None and record.get('hash') == content_hash
+        outputs = dict(record.get('outputs', {})) if same_content and record.get('status') == 'ok' else {}
+        timings = {}
+        stem = output_stem(input_path)
+        
+        phash = duplicate = None
+        if self.dedup_index is not None:
+            start = time.perf_counter()
+            proxy = load_proxy(input_path)
+            if proxy is not None:
+                phash = dhash(proxy)
+                match = self.dedup_index.find(phash, exclude=input_path)
+                if match is not None:
+                    duplicate, distance = match
+                    print(f"{input_path} is a near-duplicate of {duplicate['input']} (distance {distance})")
+            timings['dedup'] = time.perf_counter() - start
+        
+        if duplicate is not None and self.reuse_outputs:
+            reused = self.reusable_outputs(duplicate, todo, params)
+            if reused is not None:
+                outputs.update(reused)
+                # The duplicate's faces belong to its own image size, so none are stored here
+                self.manifest.append({
+                    'input': input_path, 'hash': content_hash, 'status': 'ok', 'outputs': outputs,
+                    'faces': None, 'timings': timings, 'duplicate_of': duplicate['input']
+                })
+                print(f"Reused outputs of {duplicate['input']} for {input_path}")
+                return True
+        
+        start = time.perf_counter()
+        with self.track('decode'):
+            image = cv2.imread(input_path)
+        if image is None:
+            raise ValueError(f"Could not load image: {input_path}")
+        timings['decode'] = time.perf_counter() - start
+        
+        faces = record.get('faces') if same_content else None
+        if faces is None and duplicate is not None and duplicate.get('faces') is not None:
+            faces = scale_faces(duplicate['faces'], duplicate['size'], (image.shape[1], image.shape[0]))
+        if self.needs_faces(todo) and faces is None:
+            start = time.perf_counter()
+            with self.track('detect'):
+                faces = faces_to_json(self.get_face_detector().find_faces(image))
+            timings['detect'] = time.perf_counter() - start
+        
+        if 'faces' in todo:
+            start = time.perf_counter()
+            with self.track('faces'):
+                paths = self.write_faces(image, faces, stem)
+            timings['faces'] = time.perf_counter() - start
+            outputs['faces'] = {'paths': paths, 'params': params['faces']}
+        
+        if 'blurred' in todo:
+            start = time.perf_counter()
+            with self.track('blurred'):
+                path = self.write_blurred(image, faces, stem)
+            timings['blurred'] = time.perf_counter() - start
+            outputs['blurred'] = {'paths': [path], 'params': params['blurred']}
+        
+        self.sink.add_index({
+            'input': input_path,
+            'outputs': {name: outputs[name]['paths'] for name in todo},
+            'faces': [{'box': face['box'], 'confidence': face['confidence']} for face in faces or []]
+        })
+        record = {
+            'input': input_path, 'hash': content_hash, 'status': 'ok',
+            'outputs': outputs, 'faces': faces, 'timings': timings
+        }
+        if duplicate is not None:
+            record['duplicate_of'] = duplicate['input']
+        # Outputs must be on disk before the manifest says they are
+        self.sink.flush()
+        self.manifest.append(record)
+        if phash is not None and duplicate is None:
+            self.dedup_index.add(input_path, phash, (image.shape[1], image.shape[0]), faces, outputs)
+        print(f"Processed {input_path}: {', '.join(todo)} ({sum(timings.values()):.2f}s)")
+        return True
+    
+    def reusable_outputs(self, duplicate, todo, params):
+        """The duplicate's outputs for every name in todo, or None unless all are current and present"""
+        reused = {}
+        for name in todo:
+            output = duplicate.get('outputs', {}).get(name)
+            if output is None or output.get('params') != params[name] or \
+                    not all(self.sink.exists(path) for path in output.get('paths', [])):
+                return None
+            reused[name] = output
+        return reused
+    
+    def write_blurred(self, image, faces, stem):
+        """Blur or mosaic the image at the configured stage and write it to the sink"""
+        # Faces stored by an earlier run are ignored, so blur-only outputs match their params
+        blurred = self.image_processor.apply_stage(
+            image, self.blur_stage, None if self.blur_only else faces, out=self.buffer_pool.get("batch.blurred", image.shape),
+            pool=self.buffer_pool, memory_budget=self.memory_budget)
+        return self.sink.write(f"{stem}_blurred.jpg", blurred)
+    
+    def face_levels(self, image, faces):
+        """(name suffix, (N, H, W, C) batch) for face_size and then every pyramid size"""
+        from face_detector import FaceDetector
+        max_batch_pixels = 1 << 20
+        if self.memory_budget is not None:
+            pixel_bytes = ImageProcessor.estimate_resize_bytes(image.shape, (1, 1), "vectorized")
+            max_batch_pixels = max(1, self.memory_budget // pixel_bytes)
+        batches = FaceDetector.extract_face_pyramid(
+            image, faces, [self.face_size] + self.face_pyramid, align=self.align_faces,
+            max_batch_pixels=max_batch_pixels)
+        suffixes = [""] + [f"_{width}x{height}" for width, height in self.face_pyramid]
+        return list(zip(suffixes, batches))
+    
+    def write_faces(self, image, faces, stem):
+        """Resample every face to every output size and write each one to the sink"""
+        if not faces:
+            return []
+        
+        return [self.sink.write(f"{stem}_face{i + 1}{suffix}.jpg", face_image)
+                for suffix, batch in self.face_levels(image, faces) for i, face_image in enumerate(batch)]
+    
+    def process_safely(self, input_path):
+        """Process one input, recording a failure so the next run retries it; returns the status"""
+        try:
+            return 'processed' if self.process(input_path) else 'skipped'
+        except Exception as e:
+            print(f"Failed {input_path}: {e}")
+            self.manifest.append({'input': input_path, 'hash': None, 'status': 'failed', 'error': str(e)})
+            return 'failed'
+    
+    def run(self, input_paths):
+        """Process every input, recording failures so the next run retries them"""
+        counts = {'processed': 0, 'skipped': 0, 'failed': 0}
+        for input_path in input_paths:
+            counts[self.process_safely(input_path)] += 1
+        processed, skipped, failed = counts['processed'], counts['skipped'], counts['failed']
+        
+        print(f"Batch finished: {processed} processed, {skipped} skipped, {failed} failed")
+        if self.stage_memory is not None and self.stage_memory.peaks:
+            print("Peak memory per stage:")
+            print(self.stage_memory.report())
+        return processed, skipped, failed
+    
+    def close(self):
+        """Finish the output sink and close the manifest and hash index"""
+        self.sink.close()
+        if self.owns_manifest:
+            self.manifest.close()
+        if self.dedup_index is not None:
+            self.dedup_index.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blur images and export faces without the GUI")
+    parser.add_argument("inputs", nargs="+", help="Image files or directories")
+    parser.add_argument("-o", "--output", required=True, help="Output directory")
+    add_job_arguments(parser)
+    parser.add_argument("--manifest", help="Manifest path (default: OUTPUT/manifest.jsonl)")
+    parser.add_argument("--memory-report", action="store_true", help="Report the peak memory of each stage")
+    parser.add_argument("--dedup-distance", type=int,
+                        help="Reuse detections of earlier inputs whose perceptual hash differs by at most this many bits")
+    parser.add_argument("--reuse-outputs", action="store_true",
+                        help="With --dedup-distance, reuse a near-duplicate's outputs instead of processing the input")
+    parser.add_argument("--worker-id", type=int, default=0,
+                        help="Shard name prefix, distinct for each process writing to the same output")
+    args = parser.parse_args()
+    
+    stage_memory = StageMemory() if args.memory_report else None
+    sink = None
+    if args.archive:
+        sink = ShardSink(args.output, args.archive, args.shard_size * 2 ** 20, args.worker_id)
+    dedup_index = None
+    if args.dedup_distance is not None:
+        dedup_index = HashIndex(os.path.join(args.output, "phash.jsonl"), args.dedup_distance)
+    processor = BatchProcessor(args.output, manifest_path=args.manifest, stage_memory=stage_memory, sink=sink,
+                               dedup_index=dedup_index, reuse_outputs=args.reuse_outputs, **job_options(args))
+    try:
+        processor.run(collect_inputs(args.inputs))
+    finally:
+        processor.close()
+
+
+if __name__ == "__main__":
+    main()
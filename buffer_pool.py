@@ -0,0 +1,53 @@
+import numpy as np
+
+
+class BufferPool:
+    """Named, growable scratch buffers shared by repeated image operations.
+    
+    Every name owns one flat byte buffer. ``get`` hands out a view of it with the
+    requested shape and dtype and only reallocates when a larger size is needed,
+    so a loop over images of similar size settles at zero allocations. Buffers
+    are overwritten by the next ``get`` with the same name, and a pool is not
+    thread-safe: give each worker thread its own pool.
+    """
+    
+    def __init__(self, growth=1.5):
+        self.growth = growth
+        self.buffers = {}
+        self.allocations = 0
+    
+    def get(self, name, shape, dtype=np.uint8):
+        """Return a buffer view with the given shape and dtype, reusing memory where possible"""
+        shape = tuple(int(s) for s in shape)
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        
+        backing = self.buffers.get(name)
+        if backing is None or backing.nbytes < nbytes:
+            capacity = nbytes
+            if backing is not None:
+                capacity = max(nbytes, int(backing.nbytes * self.growth))
+            backing = np.empty(capacity, dtype=np.uint8)
+            self.buffers[name] = backing
+            self.allocations += 1
+        
+        return backing[:nbytes].view(dtype).reshape(shape)
+    
+    def release(self, name=None):
+        """Free one named buffer, or every buffer when no name is given"""
+        if name is None:
+            self.buffers.clear()
+        else:
+            self.buffers.pop(name, None)
+    
+    @property
+    def nbytes(self):
+        """Total bytes currently held by the pool"""
+        return sum(buffer.nbytes for buffer in self.buffers.values())
+
+
+def scratch(pool, name, shape, dtype=np.uint8):
+    """Take a buffer from the pool, or allocate a fresh one when no pool is given"""
+    if pool is None:
+        return np.empty(shape, dtype=dtype)
+    return pool.get(name, shape, dtype)
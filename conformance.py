@@ -0,0 +1,233 @@
+import argparse
+import sys
+
+import cv2
+import numpy as np
+
+from image_processor import ImageProcessor
+from settings import BLUR_STAGES
+
+
+# Minimum PSNR (dB) and maximum absolute error per engine against its reference.
+# Blur engines are checked against cv2.GaussianBlur. cv2 rounds its own 8-bit
+# weights, which costs a few levels once the kernel is far larger than the image.
+# Resize engines are checked against cv2 bicubic at the same sample positions;
+# the allowance covers OpenCV's a = -0.75 kernel against Catmull-Rom.
+TOLERANCES = {
+    "blur.manual": (40.0, 4),
+    "blur.fixed_point": (40.0, 4),
+    "blur.cascade.fixed_point": (30.0, ImageProcessor.CASCADE_TOLERANCE),
+    "blur.cascade.manual": (30.0, ImageProcessor.CASCADE_TOLERANCE),
+    "blur.sweep": (40.0, 4),
+    "resize.manual": (30.0, 24),
+    "resize.vectorized": (30.0, 24),
+    "letterbox.area": (30.0, 24),
+    "batch.blur": (40.0, 4),
+    "batch.resize": (30.0, 24),
+    "batch.letterbox": (30.0, 24),
+}
+
+# Corpus sizes: odd sizes, single-pixel rows and columns, extreme aspect ratios
+CORPUS_SIZES = [(17, 23), (1, 31), (29, 1), (1, 1), (2, 3), (5, 180), (160, 4), (64, 48)]
+
+
+def generate_corpus(seed=0):
+    """Deterministic test images: smooth gradients, noise and hard edges at every corpus size"""
+    rng = np.random.default_rng(seed)
+    corpus = []
+    for height, width in CORPUS_SIZES:
+        yy, xx = np.mgrid[0:height, 0:width].astype(np.float64)
+        smooth = 127 + 90 * np.sin(xx / 7.0 + 1.0) * np.cos(yy / 5.0)
+        smooth = np.stack([smooth, smooth[::-1], 255 - smooth], axis=-1) if height > 0 else smooth
+        edges = np.where((xx + 2 * yy) % 12 < 6, 230, 20)[..., None].repeat(3, axis=2)
+        noise = rng.integers(0, 256, (height, width, 3))
+        for kind, image in (("smooth", smooth), ("edges", edges), ("noise", noise)):
+            corpus.append((f"{kind}_{height}x{width}", np.clip(image, 0, 255).astype(np.uint8)))
+    return corpus
+
+
+def psnr(result, reference):
+    """Peak signal-to-noise ratio in dB, infinite for identical images"""
+    mse = np.mean((result.astype(np.float64) - reference.astype(np.float64)) ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+
+def reference_blur(image, kernel_size, sigma):
+    """cv2.GaussianBlur, as in auto_app.apply_gaussian_blur"""
+    if kernel_size % 2 == 0:
+        kernel_size += 1
+    return cv2.GaussianBlur(image, (kernel_size, kernel_size), sigma)
+
+
+def reference_resize(image, target_size):
+    """cv2 bicubic at the repo's sample positions (x * src_w / dst_w, no half-pixel shift)
+    
+    cv2.resize centres its samples on pixel centres, so it is compared through
+    cv2.remap instead; what remains is the kernel difference (OpenCV's a = -0.75
+    against Catmull-Rom's a = -0.5) and truncation instead of rounding.
+    """
+    src_h, src_w = image.shape[:2]
+    dst_w, dst_h = target_size
+    map_x = np.broadcast_to((np.arange(dst_w) * (src_w / dst_w)).astype(np.float32)[None, :], (dst_h, dst_w))
+    map_y = np.broadcast_to((np.arange(dst_h) * (src_h / dst_h)).astype(np.float32)[:, None], (dst_h, dst_w))
+    return cv2.remap(image, np.ascontiguousarray(map_x), np.ascontiguousarray(map_y),
+                     cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+
+
+def reference_letterbox(image, target_size):
+    """auto_app.resize_to_exact_size rebuilt from cv2 with the repo's area prefilter
+    
+    The image is first shrunk by the same whole factor with cv2.INTER_AREA, then
+    resized with reference_resize into the centred letterbox.
+    """
+    h, w = image.shape[:2]
+    target_w, target_h = target_size
+    scale = min(target_w / w, target_h / h)
+    new_w, new_h = max(1, int(w * scale)), max(1, int(h * scale))
+    factor = min(w // new_w, h // new_h)
+    if factor >= 2:
+        h, w = h // factor, w // factor
+        image = cv2.resize(image[:h * factor, :w * factor], (w, h), interpolation=cv2.INTER_AREA)
+    resized = reference_resize(image, (new_w, new_h))
+    canvas = np.zeros((target_h, target_w, 3), dtype=np.uint8)
+    x_offset = (target_w - new_w) // 2
+    y_offset = (target_h - new_h) // 2
+    canvas[y_offset:y_offset+new_h, x_offset:x_offset+new_w] = resized
+    return canvas
+
+
+def cascade_blur(image, stage_index, engine):
+    """Blur a stage from the previous stage's result with one engine, as compute_blur_stage does"""
+    stage = BLUR_STAGES[stage_index]
+    if stage_index == 0:
+        return None
+    base = BLUR_STAGES[stage_index - 1]
+    residual = ImageProcessor.residual_blur_params(base['kernel'], base['sigma'], stage['kernel'], stage['sigma'])
+    if residual is None:
+        return None
+    source = ImageProcessor.apply_gaussian_blur(image, base['kernel'], base['sigma'], engine=engine)
+    return ImageProcessor.apply_gaussian_blur(source, residual[0], residual[1], engine=engine)
+
+
+def blur_cases(engines):
+    """(engine, case name, result, reference) for every blur engine, corpus image and stage
+    
+    "cascade" checks cascaded stages through both the manual engine, which the
+    app's stages use by default, and the fixed-point engine.
+    """
+    for name, image in generate_corpus():
+        # Mosaic stages have no Gaussian reference
+        stages = [(index, stage) for index, stage in enumerate(BLUR_STAGES)
+                  if not ImageProcessor.stage_uses_faces(stage)]
+        swept = ImageProcessor.blur_sweep(image, [(stage['kernel'], stage['sigma']) for _, stage in stages])
+        for stage_index, stage in stages:
+            reference = reference_blur(image, stage['kernel'], stage['sigma'])
+            for engine in engines:
+                if engine == "sweep":
+                    result = next(swept)  # One variant per stage, in stage order
+                elif engine == "cascade":
+                    for cascade_engine in ("manual", "fixed_point"):
+                        result = cascade_blur(image, stage_index, cascade_engine)
+                        if result is not None:
+                            yield f"blur.cascade.{cascade_engine}", f"{name} {stage['name']}", result, reference
+                    continue
+                else:
+                    result = ImageProcessor.apply_gaussian_blur(image, stage['kernel'], stage['sigma'], engine=engine)
+                yield f"blur.{engine}", f"{name} {stage['name']}", result, reference
+
+
+def resize_cases(engines, target_sizes=((9, 13), (40, 30), (3, 70))):
+    """(engine, case name, result, reference) for every resize engine, corpus image and target size"""
+    image_processor = ImageProcessor()
+    for name, image in generate_corpus():
+        for target_size in target_sizes:
+            reference = reference_resize(image, target_size)
+            for engine in engines:
+                result = ImageProcessor.resize_bicubic(image, target_size, engine=engine)
+                yield f"resize.{engine}", f"{name} -> {target_size[0]}x{target_size[1]}", result, reference
+            
+            # Letterboxed display path with the area prefilter
+            letterbox = image_processor.resize_to_exact_size(image, target_size, prefilter="area")
+            yield "letterbox.area", f"{name} -> {target_size[0]}x{target_size[1]}", letterbox, \
+                reference_letterbox(image, target_size)
+
+
+def batch_cases(stage_index=0, target_size=(40, 30)):
+    """(engine, case name, result, reference) for the batch APIs, fed the whole corpus as one ragged list
+    
+    Grayscale and alpha copies of every image are added to the batch; the
+    grayscale reference is the colour reference's first channel.
+    """
+    corpus = generate_corpus()
+    images = [image for _, image in corpus]
+    images += [image[..., 0] for image in images] + [np.dstack([image, image[..., :1]]) for image in images]
+    names = [name for name, _ in corpus]
+    names += [f"{name} gray" for name, _ in corpus] + [f"{name} alpha" for name, _ in corpus]
+    
+    def as_color(image):
+        return image if image.ndim == 3 else np.repeat(image[..., None], 3, axis=2)
+    
+    def compare(engine, results, reference):
+        for name, image, result in zip(names, images, results):
+            expected = reference(as_color(image)[..., :3])
+            if image.ndim == 2:
+                expected = expected[..., 0]
+            elif image.shape[2] == 4:
+                result = result[..., :3]
+            yield engine, name, result, expected
+    
+    stage = BLUR_STAGES[stage_index]
+    yield from compare("batch.blur", ImageProcessor.blur_batch(images, stage['kernel'], stage['sigma']),
+                       lambda image: reference_blur(image, stage['kernel'], stage['sigma']))
+    yield from compare("batch.resize", ImageProcessor.resize_batch(images, target_size),
+                       lambda image: reference_resize(image, target_size))
+    yield from compare("batch.letterbox", ImageProcessor.letterbox_batch(images, target_size),
+                       lambda image: reference_letterbox(image, target_size))
+
+
+def run(blur_engines, resize_engines, verbose=False):
+    """Run every case, print a per-engine summary and return the failing cases"""
+    summary = {}
+    failures = []
+    cases = list(blur_cases(blur_engines)) + list(resize_cases(resize_engines)) + list(batch_cases())
+    
+    for engine, case, result, reference in cases:
+        min_psnr, max_error = TOLERANCES[engine]
+        case_psnr = psnr(result, reference)
+        case_error = int(np.abs(result.astype(np.int32) - reference.astype(np.int32)).max())
+        ok = case_psnr >= min_psnr and case_error <= max_error
+        
+        worst = summary.setdefault(engine, [0, 0, float("inf"), 0])
+        worst[0] += 1
+        worst[1] += 0 if ok else 1
+        worst[2] = min(worst[2], case_psnr)
+        worst[3] = max(worst[3], case_error)
+        if not ok:
+            failures.append((engine, case, case_psnr, case_error))
+        if verbose or not ok:
+            print(f"{'ok  ' if ok else 'FAIL'} {engine:<24} {case:<40} PSNR {case_psnr:6.2f} dB  max error {case_error}")
+    
+    print(f"\n{'engine':<24} {'cases':>5} {'failed':>6} {'worst PSNR':>11} {'worst error':>11}  tolerance")
+    for engine, (count, failed, worst_psnr, worst_error) in summary.items():
+        min_psnr, max_error = TOLERANCES[engine]
+        print(f"{engine:<24} {count:>5} {failed:>6} {worst_psnr:>8.2f} dB {worst_error:>11}  "
+              f">= {min_psnr} dB, <= {max_error}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare every blur and resize engine against the OpenCV reference")
+    parser.add_argument("--blur", nargs="*", default=sorted(ImageProcessor.BLUR_ENGINES) + ["cascade", "sweep"],
+                        help="Blur engines to check")
+    parser.add_argument("--resize", nargs="*", default=sorted(ImageProcessor.RESIZE_ENGINES),
+                        help="Resize engines to check")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print every case, not only failures")
+    args = parser.parse_args()
+    
+    failures = run(args.blur, args.resize, args.verbose)
+    print(f"\n{len(failures)} failing case(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
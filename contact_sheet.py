@@ -0,0 +1,108 @@
+import math
+import numpy as np
+from tkinter import Toplevel, Canvas, Scrollbar, Label
+from PIL import Image, ImageTk
+
+
+class ContactSheet:
+    """Scrollable grid of every extracted face, filled in as rows scroll into view
+    
+    All thumbnails live in one RGB sheet array shown as a single canvas image.
+    Rows are rendered on demand: the faces of every newly visible row are
+    resampled together in one batched extract_faces_fused pass and written into
+    the sheet, so opening a sheet of hundreds of faces only pays for the first
+    screenful.
+    """
+    
+    def __init__(self, app, thumb_size=96, columns=8, gap=4, visible_rows=6):
+        self.app = app
+        self.thumb_size = thumb_size
+        self.columns = columns
+        self.gap = gap
+        self.cell = thumb_size + gap
+        self.count = len(app.extracted_faces)
+        self.rows = math.ceil(self.count / columns)
+        
+        self.sheet = np.full((self.rows * self.cell, columns * self.cell, 3), 235, dtype=np.uint8)
+        self.filled = np.zeros(self.rows, dtype=bool)
+        self.photo = None
+        self.fill_pending = False
+        
+        self.window = Toplevel(app.main_window)
+        self.window.title(f"All Faces ({self.count})")
+        
+        info = Label(self.window, text="Click a face to open it at full size", font=("Arial", 10))
+        info.grid(row=0, column=0, columnspan=2, pady=5)
+        
+        sheet_h, sheet_w = self.sheet.shape[:2]
+        self.canvas = Canvas(self.window, width=sheet_w, height=min(self.rows, visible_rows) * self.cell,
+                             scrollregion=(0, 0, sheet_w, sheet_h), highlightthickness=0)
+        scrollbar = Scrollbar(self.window, orient="vertical", command=self.canvas.yview)
+        self.canvas.config(yscrollcommand=lambda first, last: (scrollbar.set(first, last), self.schedule_fill()))
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+        scrollbar.grid(row=1, column=1, sticky="ns")
+        self.window.grid_rowconfigure(1, weight=1)
+        self.window.grid_columnconfigure(0, weight=1)
+        
+        self.present()
+        self.image_item = self.canvas.create_image(0, 0, anchor="nw", image=self.photo)
+        
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<Configure>", lambda e: self.schedule_fill())
+        self.canvas.bind("<MouseWheel>", lambda e: self.canvas.yview_scroll(-1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+        self.schedule_fill()
+    
+    def schedule_fill(self):
+        """Fill newly visible rows once Tk is idle, coalescing bursts of scroll events"""
+        if not self.fill_pending:
+            self.fill_pending = True
+            self.window.after_idle(self.fill_visible)
+    
+    def fill_visible(self):
+        """Render every visible row that has not been rendered yet"""
+        self.fill_pending = False
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        first = max(0, int(top // self.cell))
+        last = min(self.rows - 1, int(bottom // self.cell) + 1)
+        
+        pending = [row for row in range(first, last + 1) if not self.filled[row]]
+        if pending:
+            self.render_rows(pending)
+            self.present()
+    
+    def render_rows(self, rows):
+        """Resample the faces of the given rows in one batch and composite them into the sheet"""
+        indices = [i for row in rows for i in range(row * self.columns, min((row + 1) * self.columns, self.count))]
+        faces = [self.app.faces[self.app.extracted_faces[i].index] for i in indices]
+        thumbs = self.app.face_detector.extract_faces_fused(
+            self.app.original_image, faces, (self.thumb_size, self.thumb_size), align=self.app.align_faces)
+        
+        size, cell, offset = self.thumb_size, self.cell, self.gap // 2
+        for thumb, index in zip(thumbs, indices):
+            row, col = divmod(index, self.columns)
+            y = row * cell + offset
+            x = col * cell + offset
+            self.sheet[y:y+size, x:x+size] = thumb[:, :, ::-1]
+        
+        self.filled[rows] = True
+    
+    def present(self):
+        """Push the sheet array into the single canvas PhotoImage"""
+        sheet_h, sheet_w = self.sheet.shape[:2]
+        pil_image = Image.frombuffer("RGB", (sheet_w, sheet_h), self.sheet, "raw", "RGB", 0, 1)
+        if self.photo is None:
+            self.photo = ImageTk.PhotoImage(image=pil_image)
+        else:
+            self.photo.paste(pil_image)
+    
+    def on_click(self, event):
+        """Open the clicked face at full display size in the main window"""
+        x = self.canvas.canvasx(event.x)
+        y = self.canvas.canvasy(event.y)
+        col, row = int(x // self.cell), int(y // self.cell)
+        index = row * self.columns + col
+        if 0 <= col < self.columns and 0 <= index < self.count:
+            self.app.show_face(index)
@@ -0,0 +1,116 @@
+import json
+import os
+
+import cv2
+import numpy as np
+
+from manifest import open_jsonl
+
+
+# Set bits of every 16-bit value, for vectorized Hamming distances
+POPCOUNT_16 = np.array([bin(i).count("1") for i in range(1 << 16)], dtype=np.uint8)
+
+
+def load_proxy(path):
+    """Decode a small grayscale proxy of an image file
+    
+    JPEGs are decoded at 1/8 scale straight from the DCT coefficients, which is
+    many times faster than a full decode; other formats are decoded and reduced.
+    """
+    return cv2.imread(path, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+
+
+def dhash(gray, hash_size=8):
+    """Difference hash: one bit per horizontal brightness gradient of a tiny resample
+    
+    Resizing, re-encoding and small exposure changes leave most gradients'
+    signs unchanged, so near-duplicates differ in only a few of the 64 bits.
+    """
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def scale_faces(faces, from_size, to_size):
+    """Rescale MTCNN-style face dictionaries from an image of from_size (w, h) to one of to_size"""
+    scale_x = to_size[0] / from_size[0]
+    scale_y = to_size[1] / from_size[1]
+    scaled = []
+    for face in faces:
+        x, y, w, h = face['box']
+        scaled.append({
+            'box': [int(round(x * scale_x)), int(round(y * scale_y)),
+                    int(round(w * scale_x)), int(round(h * scale_y))],
+            'confidence': face['confidence'],
+            'keypoints': {name: [point[0] * scale_x, point[1] * scale_y]
+                          for name, point in face.get('keypoints', {}).items()}
+        })
+    return scaled
+
+
+class HashIndex:
+    """Perceptual hashes of processed inputs, in memory and persisted as append-only JSONL
+    
+    Every entry holds an input's 64-bit hash, its image size, its detected faces
+    and its outputs. ``find`` returns the closest earlier entry within
+    ``max_distance`` differing bits; the hashes are kept in one uint64 array, so
+    a lookup is a single vectorized XOR and popcount over the whole index. As
+    with BatchManifest, the last line for an input wins and cut-short lines are
+    ignored.
+    """
+    
+    def __init__(self, path, max_distance=4):
+        self.path = path
+        self.max_distance = max_distance
+        self.entries = []
+        self.positions = {}
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.count = 0
+        
+        records, self.file = open_jsonl(path)
+        for entry in records:
+            try:
+                self.insert(entry)
+            except KeyError:
+                continue
+    
+    def insert(self, entry):
+        """Add or replace an entry in memory"""
+        position = self.positions.get(entry['input'])
+        if position is None:
+            position = self.count
+            if self.count == len(self.hashes):
+                grown = np.empty(max(1024, 2 * len(self.hashes)), dtype=np.uint64)
+                grown[:self.count] = self.hashes[:self.count]
+                self.hashes = grown
+            self.entries.append(entry)
+            self.positions[entry['input']] = position
+            self.count += 1
+        else:
+            self.entries[position] = entry
+        self.hashes[position] = int(entry['hash'], 16)
+    
+    def add(self, input_path, hash_value, size, faces, outputs):
+        """Record a processed input and flush it to disk"""
+        entry = {'input': os.path.abspath(input_path), 'hash': f"{hash_value:016x}",
+                 'size': list(size), 'faces': faces, 'outputs': outputs}
+        self.insert(entry)
+        self.file.write(json.dumps(entry, sort_keys=True) + "\n")
+        self.file.flush()
+    
+    def find(self, hash_value, exclude=None):
+        """Closest entry within max_distance bits, as (entry, distance), or None"""
+        if self.count == 0:
+            return None
+        differences = self.hashes[:self.count] ^ np.uint64(hash_value)
+        distances = POPCOUNT_16[differences.view(np.uint16).reshape(-1, 4)].sum(axis=1, dtype=np.int32)
+        if exclude is not None and os.path.abspath(exclude) in self.positions:
+            distances[self.positions[os.path.abspath(exclude)]] = 65
+        best = int(np.argmin(distances))
+        if distances[best] > self.max_distance:
+            return None
+        return self.entries[best], int(distances[best])
+    
+    def close(self):
+        """Close the index file"""
+        self.file.close()
@@ -0,0 +1,70 @@
+import numpy as np
+from PIL import Image, ImageTk
+
+
+class DisplayAdapter:
+    """Convert BGR arrays into Tk images with as few full-frame copies as possible.
+    
+    Each pane owns a persistent RGB canvas and a persistent PhotoImage. The
+    letterbox resize writes straight into the canvas with the channels swapped,
+    the canvas is wrapped by PIL without copying, and the PhotoImage is updated
+    in place with ``paste``.
+    """
+    
+    def __init__(self, image_processor, pool=None):
+        self.image_processor = image_processor
+        self.pool = pool
+        self.canvases = {}
+        self.photos = {}
+    
+    def get_canvas(self, pane, size):
+        """Return the persistent RGB canvas for a pane, reallocating only on size change"""
+        width, height = size
+        canvas = self.canvases.get(pane)
+        if canvas is None or canvas.shape[:2] != (height, width):
+            canvas = np.zeros((height, width, 3), dtype=np.uint8)
+            self.canvases[pane] = canvas
+        return canvas
+    
+    def write_rgb(self, pane, image_bgr, size):
+        """Write a BGR image into the pane canvas as RGB, letterboxing if needed"""
+        canvas = self.get_canvas(pane, size)
+        width, height = size
+        
+        if image_bgr.shape[:2] == (height, width):
+            # Already display sized: the channel swap is the only copy
+            np.copyto(canvas, image_bgr[:, :, ::-1])
+        else:
+            self.image_processor.resize_to_exact_size(
+                image_bgr, size, out=canvas, swap_rb=True, pool=self.pool)
+        
+        return canvas
+    
+    def render(self, pane, image_bgr, size):
+        """Render a BGR image into the pane's persistent PhotoImage"""
+        self.write_rgb(pane, image_bgr, size)
+        return self.present(pane, size)
+    
+    def render_view(self, pane, pyramid, zoom, center, size):
+        """Render a zoomed and panned view of a TilePyramid into the pane's PhotoImage"""
+        pyramid.render(zoom, center, self.get_canvas(pane, size))
+        return self.present(pane, size)
+    
+    def present(self, pane, size):
+        """Push the pane canvas into its persistent PhotoImage"""
+        canvas = self.get_canvas(pane, size)
+        pil_image = Image.frombuffer("RGB", size, canvas, "raw", "RGB", 0, 1)
+        
+        photo = self.photos.get(pane)
+        if photo is None or (photo.width(), photo.height()) != tuple(size):
+            photo = ImageTk.PhotoImage(image=pil_image)
+            self.photos[pane] = photo
+        else:
+            photo.paste(pil_image)
+        
+        return photo
+    
+    def clear(self):
+        """Drop all persistent canvases and photo images"""
+        self.canvases.clear()
+        self.photos.clear()
@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+class LatestWinsScheduler:
+    """Debounce a stream of requests and compute only the newest one, off the Tk thread
+    
+    ``submit`` records the latest request and restarts a short debounce timer. When
+    the timer fires, that request is handed to ``work`` on a single background
+    worker. Requests submitted while it runs just replace the pending one, so
+    superseded requests are dropped instead of queueing up. ``done`` is called on
+    the Tk thread with a finished result only when no newer request is waiting;
+    otherwise the newest request is started straight away.
+    
+    With ``snapshot``, it is called on the Tk thread as each request starts and
+    its result is passed to ``work`` after the request, so the worker never reads
+    state that the Tk thread may change meanwhile.
+    """
+    
+    def __init__(self, root, work, done, delay_ms=60, poll_ms=15, snapshot=None):
+        self.root = root
+        self.work = work
+        self.done = done
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
+        self.snapshot = snapshot
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = None
+        self.has_pending = False
+        self.running = None
+        self.running_request = None
+        self.timer = None
+    
+    def submit(self, request):
+        """Make request the latest one and restart the debounce timer"""
+        self.pending = request
+        self.has_pending = True
+        if self.timer is not None:
+            self.root.after_cancel(self.timer)
+        self.timer = self.root.after(self.delay_ms, self.start)
+    
+    @property
+    def busy(self):
+        """True while a request is being computed or waiting to start"""
+        return self.running is not None or self.has_pending
+    
+    def start(self):
+        """Start the pending request unless one is already running"""
+        self.timer = None
+        if self.running is not None or not self.has_pending:
+            return
+        
+        self.running_request = self.pending
+        self.has_pending = False
+        args = (self.running_request,) if self.snapshot is None else (self.running_request, self.snapshot())
+        self.running = self.executor.submit(self.work, *args)
+        self.root.after(self.poll_ms, self.poll)
+    
+    def poll(self):
+        """Check the running request from the Tk thread and deliver or supersede it"""
+        if self.running is None:
+            return  # Cancelled, or delivered by another poll after a cancel
+        if not self.running.done():
+            self.root.after(self.poll_ms, self.poll)
+            return
+        
+        future = self.running
+        self.running = None
+        
+        if self.has_pending and self.pending != self.running_request:
+            # Superseded while computing: drop this result and go straight to the newest
+            self.start()
+            return
+        
+        self.has_pending = False
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Background task error: {e}")
+            return
+        self.done(self.running_request, result)
+    
+    def cancel(self):
+        """Drop the pending request and forget the running one, so its result never reaches ``done``
+        
+        Used when the inputs the requests refer to are replaced. Nothing waits for
+        the worker: a stale job finishes in the background, and the next request
+        queues behind it on the single worker.
+        """
+        if self.timer is not None:
+            self.root.after_cancel(self.timer)
+            self.timer = None
+        self.has_pending = False
+        self.running = None
+    
+    def shutdown(self):
+        """Cancel the debounce timer and stop the worker once its current task ends"""
+        if self.timer is not None:
+            self.root.after_cancel(self.timer)
+            self.timer = None
+        self.has_pending = False
+        self.executor.shutdown(wait=False)
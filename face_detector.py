@@ -1,16 +1,66 @@
 import cv2
-from mtcnn import MTCNN
+import math
+import numpy as np
+
+from image_processor import ImageProcessor
+
+
+class FaceRecord:
+    """One extracted face: its padded box in the source image and a lazy crop of it
+    
+    No pixels are stored. ``image`` is a read-only view into the source, so faces
+    that are never shown cost nothing, and ``copy_image`` is the only place a crop
+    is copied, for callers that modify or keep it.
+    """
+    __slots__ = ('source', 'box', 'confidence', 'index', 'keypoints')
+    
+    def __init__(self, source, box, confidence, index, keypoints=None):
+        self.source = source
+        self.box = box
+        self.confidence = confidence
+        self.index = index
+        self.keypoints = keypoints
+    
+    @property
+    def image(self):
+        """Read-only view of the padded face crop"""
+        x, y, w, h = self.box
+        view = self.source[y:y+h, x:x+w]
+        view.flags.writeable = False
+        return view
+    
+    def copy_image(self):
+        """Writable copy of the padded face crop"""
+        x, y, w, h = self.box
+        return self.source[y:y+h, x:x+w].copy()
+    
+    def __getitem__(self, key):
+        """Dictionary-style access, as for the earlier dict face records"""
+        if key not in ('image', 'box', 'confidence', 'index', 'keypoints'):
+            raise KeyError(key)
+        return getattr(self, key)
 
 
 class FaceDetector:
+    # Aligned extraction template, as fractions of the output width and height:
+    # where the midpoint between the eyes lands, and the inter-ocular distance
+    ALIGNED_EYE_CENTER = (0.5, 0.4)
+    ALIGNED_EYE_DISTANCE = 0.3
+    
     def __init__(self):
+        # Imported here, so the face extraction helpers load without TensorFlow
+        from mtcnn import MTCNN
         self.detector = MTCNN()
     
+    def find_faces(self, image):
+        """Run MTCNN on a BGR image and return its face dictionaries"""
+        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        return self.detector.detect_faces(rgb_image)
+    
     def detect_faces(self, image, app):
         """Detect faces in the image"""
         try:
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            app.faces = self.detector.detect_faces(rgb_image)
+            app.faces = self.find_faces(image)
             
             if len(app.faces) == 0:
                 return False
@@ -21,26 +71,111 @@ class FaceDetector:
             print(f"Face detection error: {e}")
             return False
     
+    @staticmethod
+    def padded_box(face, image_shape):
+        """Detection box grown by 20% padding and clipped to the image"""
+        x, y, w, h = face['box']
+        
+        padding = int(min(w, h) * 0.2)
+        x = max(0, x - padding)
+        y = max(0, y - padding)
+        w = min(image_shape[1] - x, w + 2 * padding)
+        h = min(image_shape[0] - y, h + 2 * padding)
+        return x, y, w, h
+    
     def extract_all_faces(self, image, faces):
-        """Extract all faces from the image and store them in temporary storage"""
+        """Extract all faces from the image as lightweight records that reference it without copying"""
         extracted_faces = []
         
         for i, face in enumerate(faces):
-            x, y, w, h = face['box']
-            
-            padding = int(min(w, h) * 0.2)
-            x = max(0, x - padding)
-            y = max(0, y - padding)
-            w = min(image.shape[1] - x, w + 2 * padding)
-            h = min(image.shape[0] - y, h + 2 * padding)
-            
-            face_image = image[y:y+h, x:x+w].copy()
-            
-            extracted_faces.append({
-                'image': face_image,
-                'box': (x, y, w, h),
-                'confidence': face['confidence'],
-                'index': i
-            })
-        
-        return extracted_faces
\ No newline at end of file
+            extracted_faces.append(FaceRecord(
+                image,
+                self.padded_box(face, image.shape),
+                face['confidence'],
+                i,
+                face.get('keypoints')
+            ))
+        
+        return extracted_faces
+    
+    @classmethod
+    def face_sampling_grid(cls, face, image_shape, target_size, align=False):
+        """Source coordinates in the original image for every pixel of one output face"""
+        target_w, target_h = target_size
+        xs = np.arange(target_w, dtype=np.float64)
+        ys = np.arange(target_h, dtype=np.float64)
+        keypoints = face.get('keypoints')
+        
+        if not align or not keypoints:
+            # Same mapping as cropping the padded box and resizing it to target_size
+            x, y, w, h = cls.padded_box(face, image_shape)
+            map_x = x + xs * (w / target_w)
+            map_y = y + ys * (h / target_h)
+            return np.broadcast_to(map_x[None, :], (target_h, target_w)), \
+                   np.broadcast_to(map_y[:, None], (target_h, target_w))
+        
+        # Similarity transform that levels the eyes and fixes the inter-ocular distance
+        left_eye = np.asarray(keypoints['left_eye'], dtype=np.float64)
+        right_eye = np.asarray(keypoints['right_eye'], dtype=np.float64)
+        eye_center = (left_eye + right_eye) / 2
+        dx, dy = right_eye - left_eye
+        scale = max(math.hypot(dx, dy), 1.0) / (cls.ALIGNED_EYE_DISTANCE * target_w)
+        cos_a = math.cos(math.atan2(dy, dx)) * scale
+        sin_a = math.sin(math.atan2(dy, dx)) * scale
+        
+        u = xs[None, :] - cls.ALIGNED_EYE_CENTER[0] * target_w
+        v = ys[:, None] - cls.ALIGNED_EYE_CENTER[1] * target_h
+        map_x = eye_center[0] + cos_a * u - sin_a * v
+        map_y = eye_center[1] + sin_a * u + cos_a * v
+        return map_x, map_y
+    
+    @classmethod
+    def extract_faces_fused(cls, image, faces, target_size, align=False, out=None, max_batch_pixels=1 << 20):
+        """Sample every face straight from the original into one (N, H, W, C) array
+        
+        Cropping, padding, optional keypoint alignment and the bicubic resize are
+        folded into one resampling pass with no intermediate crops. The sampling
+        grids of as many faces as fit in ``max_batch_pixels`` are stacked and
+        resampled together, so small outputs such as thumbnails take a single
+        vectorized pass for the whole batch.
+        """
+        target_w, target_h = target_size
+        if out is None:
+            out = np.empty((len(faces), target_h, target_w) + image.shape[2:], dtype=np.uint8)
+        
+        chunk = max(1, max_batch_pixels // (target_w * target_h))
+        for start in range(0, len(faces), chunk):
+            grids = [cls.face_sampling_grid(face, image.shape, target_size, align)
+                     for face in faces[start:start + chunk]]
+            map_x = np.stack([grid[0] for grid in grids])
+            map_y = np.stack([grid[1] for grid in grids])
+            ImageProcessor.sample_bicubic(image, map_x, map_y, out=out[start:start + len(grids)])
+        
+        return out
+    
+    @classmethod
+    def extract_face_pyramid(cls, image, faces, sizes, align=False, max_batch_pixels=1 << 20):
+        """Every face at each (w, h) in sizes, as one (N, h, w, C) batch per size, in the order of sizes
+        
+        Only the largest size is sampled from the original, by extract_faces_fused.
+        Each smaller level is derived from the level above it: the whole batch is
+        shrunk by the largest whole factor with decimate_area, a prefilter shared by
+        all faces, and resize_bicubic_separable covers the remaining fraction with
+        tap tables shared by all faces.
+        """
+        levels = [None] * len(sizes)
+        above = None
+        for index in sorted(range(len(sizes)), key=lambda i: sizes[i][0] * sizes[i][1], reverse=True):
+            target_w, target_h = sizes[index]
+            if above is None:
+                level = cls.extract_faces_fused(image, faces, (target_w, target_h), align=align,
+                                                max_batch_pixels=max_batch_pixels)
+            else:
+                level = above
+                factor = min(level.shape[2] // target_w, level.shape[1] // target_h)
+                if factor >= 2:
+                    level = ImageProcessor.decimate_area(level, factor)
+                if level.shape[1:3] != (target_h, target_w):
+                    level = ImageProcessor.resize_bicubic_separable(level, (target_w, target_h))
+            levels[index] = above = level
+        return levels
@@ -1,6 +1,6 @@
+import os
+
 from tkinter import Toplevel, Frame, Label, Button, Scale, HORIZONTAL
-from PIL import Image, ImageTk
-import cv2
 
 
 class GUIBuilder:
@@ -50,6 +50,10 @@ class GUIBuilder:
         spacer_frame.grid(row=2, column=0, sticky="ew")
         spacer_frame.grid_propagate(False)  # Keep fixed height
         
+        # Folder session navigation sits in the spacer
+        if self.app.prefetcher is not None:
+            self.create_folder_navigation(spacer_frame)
+        
         # ============================================
         # CONTROL SECTION (Row 3) - Only adjuster remains
         # ============================================
@@ -68,7 +72,7 @@ class GUIBuilder:
         # Current blur info
         current_stage = self.app.blur_stages[self.app.current_blur_stage]
         self.app.blur_info_label = Label(control_container,
-                                        text=f"{current_stage['name']} | Kernel: {current_stage['kernel']}x{current_stage['kernel']} | Sigma: {current_stage['sigma']}",
+                                        text=self.app.stage_description(current_stage),
                                         font=("Arial", 11, "bold"),
                                         fg=current_stage['color'])
         self.app.blur_info_label.pack(pady=(0, 15))
@@ -78,7 +82,7 @@ class GUIBuilder:
         slider_frame.pack(pady=5)
         
         # Min label
-        min_label = Label(slider_frame, text="Light", font=("Arial", 9, "bold"))
+        min_label = Label(slider_frame, text=self.app.blur_stages[0]['name'].split()[0], font=("Arial", 9, "bold"))
         min_label.pack(side="left", padx=5)
         
         # Slider
@@ -90,7 +94,7 @@ class GUIBuilder:
         self.app.slider.pack(side="left", padx=15)
         
         # Max label
-        max_label = Label(slider_frame, text="Heavy", font=("Arial", 9, "bold"))
+        max_label = Label(slider_frame, text=self.app.blur_stages[-1]['name'].split()[0], font=("Arial", 9, "bold"))
         max_label.pack(side="left", padx=5)
         
         # Stage indicators (dots only, no descriptions)
@@ -123,9 +127,6 @@ class GUIBuilder:
         # ============================================
         bottom_spacer = Frame(main_window)
         bottom_spacer.grid(row=4, column=0, sticky="nsew")
-        
-        # Start the main loop
-        main_window.mainloop()
     
     def create_image_columns(self, image_row_frame):
         """Create the three image columns"""
@@ -139,14 +140,13 @@ class GUIBuilder:
         original_title.grid(row=0, column=0, pady=(0, 5), sticky="n")
         
         # Original image display
-        original_rgb = cv2.cvtColor(self.app.original_image, cv2.COLOR_BGR2RGB)
-        original_resized = self.app.resize_to_exact_size(original_rgb, self.app.image_display_size)
-        original_pil = Image.fromarray(original_resized)
-        self.app.original_photo = ImageTk.PhotoImage(image=original_pil)
+        self.app.original_photo = self.app.display_adapter.render(
+            "original", self.app.original_image, self.app.image_display_size)
         
         self.app.original_label = Label(col0, image=self.app.original_photo, 
                                     relief="solid", bd=2)
         self.app.original_label.grid(row=1, column=0, pady=(0, 5), sticky="n")
+        self.bind_zoom_pan(self.app.original_label)
         
         # Original info
         original_info = Label(col0, 
@@ -168,14 +168,18 @@ class GUIBuilder:
         blurred_title.grid(row=0, column=0, pady=(0, 5), sticky="n")
         
         # Blurred image display
-        blurred_rgb = cv2.cvtColor(self.app.blurred_image, cv2.COLOR_BGR2RGB)
-        blurred_resized = self.app.resize_to_exact_size(blurred_rgb, self.app.image_display_size)
-        blurred_pil = Image.fromarray(blurred_resized)
-        self.app.blurred_photo = ImageTk.PhotoImage(image=blurred_pil)
+        self.app.blurred_photo = self.app.display_adapter.render(
+            "blurred", self.app.blurred_image, self.app.image_display_size)
         
         self.app.blurred_label = Label(col1, image=self.app.blurred_photo, 
                                     relief="solid", bd=2)
         self.app.blurred_label.grid(row=1, column=0, pady=(0, 5), sticky="n")
+        self.bind_zoom_pan(self.app.blurred_label)
+        
+        # Zoom info
+        self.app.zoom_label = Label(col1, text="", font=("Arial", 9))
+        self.app.zoom_label.grid(row=2, column=0, sticky="n")
+        self.app.update_zoom_info()
         
         # Configure column 1
         col1.grid_rowconfigure(1, weight=1)
@@ -191,12 +195,16 @@ class GUIBuilder:
         face_title.grid(row=0, column=0, pady=(0, 5), sticky="n")
         
         # Face image display
-        face_rgb = cv2.cvtColor(self.app.resized_face_image, cv2.COLOR_BGR2RGB)
-        face_pil = Image.fromarray(face_rgb)
-        self.app.face_photo = ImageTk.PhotoImage(image=face_pil)
-        
-        self.app.face_label = Label(col2, image=self.app.face_photo, 
-                                relief="solid", bd=2)
+        if self.app.resized_face_image is not None:
+            self.app.face_photo = self.app.display_adapter.render(
+                "face", self.app.resized_face_image, self.app.face_display_size)
+            
+            self.app.face_label = Label(col2, image=self.app.face_photo, 
+                                    relief="solid", bd=2)
+        else:
+            # Blur-only sessions detect no faces
+            self.app.face_label = Label(col2, text="Face detection off (blur-only mode)", 
+                                    font=("Arial", 11), fg="#666666", relief="solid", bd=2, padx=20, pady=20)
         self.app.face_label.grid(row=1, column=0, pady=(0, 5), sticky="n")
         
         # Face size info
@@ -230,6 +238,13 @@ class GUIBuilder:
                             width=3, height=1, relief="flat", bd=1)
             next_btn.pack(side="left", padx=2)
             
+            # Contact sheet of every face, for group photos
+            grid_btn = Button(nav_frame, text="▦", 
+                            command=self.app.open_contact_sheet,
+                            font=("Arial", 12, "bold"), bg="#2196F3", fg="white",
+                            width=3, height=1, relief="flat", bd=1)
+            grid_btn.pack(side="left", padx=(10, 2))
+            
             # Configure column 2 with extra row for navigation
             col2.grid_rowconfigure(1, weight=1)
             col2.grid_rowconfigure(4, weight=0)
@@ -237,4 +252,58 @@ class GUIBuilder:
             # Configure column 2 without navigation
             col2.grid_rowconfigure(1, weight=1)
         
-        col2.grid_columnconfigure(0, weight=1)
\ No newline at end of file
+        col2.grid_columnconfigure(0, weight=1)
+    
+    def create_folder_navigation(self, parent):
+        """Previous and next image buttons around the folder position"""
+        nav_frame = Frame(parent)
+        nav_frame.pack(expand=True)
+        
+        prev_btn = Button(nav_frame, text="◀", 
+                        command=lambda: self.app.navigate_images("prev"),
+                        font=("Arial", 12, "bold"), bg="#2196F3", fg="white",
+                        width=3, height=1, relief="flat", bd=1)
+        prev_btn.pack(side="left", padx=2)
+        
+        self.app.folder_label = Label(nav_frame, 
+                        text=self.folder_label_text(self.app.folder_index),
+                        font=("Arial", 10, "bold"), fg="blue")
+        self.app.folder_label.pack(side="left", padx=10)
+        
+        next_btn = Button(nav_frame, text="▶", 
+                        command=lambda: self.app.navigate_images("next"),
+                        font=("Arial", 12, "bold"), bg="#2196F3", fg="white",
+                        width=3, height=1, relief="flat", bd=1)
+        next_btn.pack(side="left", padx=2)
+    
+    def folder_label_text(self, index, loading=False):
+        """Name and position of a folder image, marked while it is being prepared"""
+        paths = self.app.prefetcher.paths
+        text = f"{os.path.basename(paths[index])} ({index + 1} of {len(paths)})"
+        return f"Preparing {text}..." if loading else text
+    
+    def bind_zoom_pan(self, label):
+        """Mouse wheel zooms, dragging pans and double-click toggles 100% in an image pane"""
+        label.bind("<MouseWheel>", lambda e: self.app.zoom_view(
+            1.25 if e.delta > 0 else 0.8, self.pane_position(label, e)))
+        label.bind("<Button-4>", lambda e: self.app.zoom_view(1.25, self.pane_position(label, e)))
+        label.bind("<Button-5>", lambda e: self.app.zoom_view(0.8, self.pane_position(label, e)))
+        label.bind("<ButtonPress-1>", self.start_pan)
+        label.bind("<B1-Motion>", self.drag_pan)
+        label.bind("<Double-Button-1>", lambda e: self.app.toggle_actual_size(self.pane_position(label, e)))
+    
+    def pane_position(self, label, event):
+        """Event position relative to the displayed image inside a pane label"""
+        display_w, display_h = self.app.image_display_size
+        return (event.x - (label.winfo_width() - display_w) / 2,
+                event.y - (label.winfo_height() - display_h) / 2)
+    
+    def start_pan(self, event):
+        """Remember where a pan drag started"""
+        self.pan_anchor = (event.x, event.y)
+    
+    def drag_pan(self, event):
+        """Pan both image panes by the mouse movement since the last event"""
+        last_x, last_y = getattr(self, 'pan_anchor', (event.x, event.y))
+        self.pan_anchor = (event.x, event.y)
+        self.app.pan_view(event.x - last_x, event.y - last_y)
\ No newline at end of file
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+def open_jsonl(path):
+    """Parse an append-only JSONL file and open it for appending; returns (records, file)
+    
+    Lines that do not parse, such as a last line cut short by an interrupted
+    write, are skipped. A file that does not end with a newline gets one before
+    anything is appended, so the next record never joins a cut-short line.
+    """
+    records = []
+    ends_with_newline = True
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                ends_with_newline = line.endswith("\n")
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    file = open(path, "a", encoding="utf-8")
+    if not ends_with_newline:
+        file.write("\n")
+        file.flush()
+    return records, file
+
+
+class BatchManifest:
+    """Append-only JSONL checkpoint of a batch run
+    
+    Every processed input appends one line with its content hash, the outputs it
+    produced and the parameter fingerprint of each output, the detected faces,
+    timings and a status. The last line for an input wins, so a restarted run
+    can skip finished work, retry failures and redo only outputs whose
+    parameters changed. A line cut short by an interrupted write is ignored.
+    Appends are serialised, so worker threads can share one manifest.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        records, self.file = open_jsonl(path)
+        self.records = {record["input"]: record for record in records}
+        self.lock = threading.Lock()
+    
+    def latest(self, input_path):
+        """Most recent record for an input, or None"""
+        return self.records.get(os.path.abspath(input_path))
+    
+    def append(self, record):
+        """Append a record and flush it so it survives an interruption"""
+        record["input"] = os.path.abspath(record["input"])
+        record["time"] = time.time()
+        line = json.dumps(record, sort_keys=True) + "\n"
+        with self.lock:
+            self.records[record["input"]] = record
+            self.file.write(line)
+            self.file.flush()
+    
+    def close(self):
+        """Close the manifest file"""
+        self.file.close()
+    
+    @staticmethod
+    def content_hash(path, chunk_size=1 << 20):
+        """SHA-256 of a file's bytes"""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def params_hash(params):
+        """Short stable fingerprint of a JSON-serialisable parameter set"""
+        encoded = json.dumps(params, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()[:16]
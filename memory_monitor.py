@@ -0,0 +1,56 @@
+import contextlib
+import os
+import tracemalloc
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StageMemory:
+    """Measured peak memory per named processing stage.
+    
+    ``track`` wraps a stage and records the tracemalloc peak above the memory in
+    use when it started (numpy reports its array buffers to tracemalloc), together
+    with the process RSS when it finished. Repeated stages keep their largest peak.
+    Tracing slows allocation-heavy Python code, so it is only switched on while a
+    stage is being tracked.
+    """
+    
+    def __init__(self):
+        self.peaks = {}
+        self.rss = {}
+    
+    @contextlib.contextmanager
+    def track(self, stage):
+        """Record the peak memory of the wrapped block under ``stage``"""
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+            if started:
+                tracemalloc.stop()
+            self.peaks[stage] = max(peak, self.peaks.get(stage, 0))
+            rss = current_rss()
+            if rss is not None:
+                self.rss[stage] = max(rss, self.rss.get(stage, 0))
+    
+    def report(self):
+        """One line per stage with its peak traced memory and RSS, in MB"""
+        lines = []
+        for stage, peak in self.peaks.items():
+            line = f"{stage:<10} peak {peak / 2 ** 20:8.1f} MB"
+            if stage in self.rss:
+                line += f"  rss {self.rss[stage] / 2 ** 20:8.1f} MB"
+            lines.append(line)
+        return "\n".join(lines)
@@ -0,0 +1,200 @@
+import io
+import json
+import os
+import re
+import tarfile
+import time
+import zipfile
+
+import cv2
+
+
+class DirectorySink:
+    """Write every output as its own file in the output directory
+    
+    Paths are returned absolute, so a manifest recording them still finds the
+    outputs when a later run starts from another working directory.
+    """
+    
+    def __init__(self, output_dir):
+        self.output_dir = os.path.abspath(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+    
+    def write(self, name, image):
+        """Save an image under name and return its path"""
+        path = os.path.join(self.output_dir, name)
+        cv2.imwrite(path, image)
+        return path
+    
+    def write_encoded(self, name, data):
+        """Save already encoded image bytes under name and return its path"""
+        path = os.path.join(self.output_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+    
+    def add_index(self, record):
+        """Nothing to index: the files themselves are the output"""
+    
+    def flush(self):
+        """Nothing buffered: every file is closed once written"""
+    
+    def exists(self, reference):
+        """True if a written output is still there"""
+        return os.path.exists(reference)
+    
+    def close(self):
+        """Nothing to flush"""
+
+
+class ShardSink:
+    """Stream encoded outputs into rolling tar or zip shards instead of loose files.
+    
+    Images are encoded in memory and appended to the open shard as one member
+    each, through a file buffer of ``buffer_size`` bytes, so nothing but the
+    current image is held and no temporary files are written. Once a shard
+    reaches ``max_shard_bytes`` it is finished and the next one is started.
+    
+    Every shard ends with an ``index.json`` member listing, per input, the
+    members written for it and the box and confidence of each face. Shards are
+    named ``shard-w{worker_id}-{sequence}`` and a sink never reopens an existing
+    shard, so parallel workers each own a sink with a distinct worker_id and
+    later runs never overwrite earlier ones. A zip shard is only readable once it
+    has been closed; a tar shard can be read up to the last complete member.
+    Callers ``flush`` before recording outputs elsewhere, and ``exists`` only
+    accepts members that are complete in a shard on disk, so a crash never leaves
+    a manifest pointing at bytes that were still in a buffer.
+    """
+    
+    FORMATS = ("tar", "zip")
+    
+    def __init__(self, output_dir, format="tar", max_shard_bytes=1 << 30, worker_id=0,
+                 buffer_size=1 << 20, encode_params=None):
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown shard format: {format}")
+        self.output_dir = output_dir
+        self.format = format
+        self.max_shard_bytes = max_shard_bytes
+        self.worker_id = worker_id
+        self.buffer_size = buffer_size
+        self.encode_params = encode_params or []
+        os.makedirs(output_dir, exist_ok=True)
+        
+        self.sequence = self.next_sequence()
+        self.shard_name = None
+        self.file = None
+        self.archive = None
+        self.index = []
+        self.open_members = set()
+        self.shard_members = {}
+    
+    def next_sequence(self):
+        """First shard number of this worker that is not on disk yet"""
+        pattern = re.compile(rf"shard-w{self.worker_id:02d}-(\d+)\.{self.format}$")
+        numbers = [int(match.group(1)) for match in map(pattern.match, os.listdir(self.output_dir)) if match]
+        return max(numbers, default=-1) + 1
+    
+    def open_shard(self):
+        """Start the next shard file"""
+        self.shard_name = f"shard-w{self.worker_id:02d}-{self.sequence:05d}.{self.format}"
+        self.sequence += 1
+        self.file = open(os.path.join(self.output_dir, self.shard_name), "wb", buffering=self.buffer_size)
+        self.open_members = set()
+        if self.format == "tar":
+            # Plain write mode never seeks back either, and unlike stream mode keeps
+            # no record buffer of its own, so flushing the file flushes every member
+            self.archive = tarfile.open(fileobj=self.file, mode="w")
+        else:
+            # JPEG and PNG are already compressed, so members are stored as they are
+            self.archive = zipfile.ZipFile(self.file, "w", zipfile.ZIP_STORED)
+    
+    def add_member(self, name, data):
+        """Append one member to the open shard"""
+        if self.format == "tar":
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self.archive.addfile(info, io.BytesIO(data))
+        else:
+            self.archive.writestr(name, data)
+    
+    def write(self, name, image):
+        """Encode an image by the extension of name, append it and return "shard:member" """
+        ok, encoded = cv2.imencode(os.path.splitext(name)[1], image, self.encode_params)
+        if not ok:
+            raise ValueError(f"Could not encode {name}")
+        return self.write_encoded(name, encoded.tobytes())
+    
+    def write_encoded(self, name, data):
+        """Append already encoded image bytes and return "shard:member" """
+        if self.archive is not None and self.file.tell() >= self.max_shard_bytes:
+            self.finish_shard()
+        if self.archive is None:
+            self.open_shard()
+        
+        self.add_member(name, data)
+        self.open_members.add(name)
+        return f"{self.shard_name}:{name}"
+    
+    def add_index(self, record):
+        """Add an input's record to the index of the shard being written, or of the next one"""
+        self.index.append(record)
+    
+    def finish_shard(self):
+        """Write the index member and close the current shard"""
+        if self.archive is None:
+            if not self.index:
+                return
+            self.open_shard()  # Records left over with no member written since the last shard
+        self.add_member("index.json", json.dumps({'shard': self.shard_name, 'records': self.index}).encode())
+        self.archive.close()
+        self.file.close()
+        self.archive = None
+        self.file = None
+        self.index = []
+    
+    def flush(self):
+        """Push the members written so far to the open shard file"""
+        if self.file is not None:
+            self.file.flush()
+    
+    def exists(self, reference):
+        """True if the member of a "shard:member" reference is complete in a shard on disk"""
+        shard_name, _, member = reference.partition(":")
+        if shard_name == self.shard_name and self.archive is not None:
+            return member in self.open_members
+        
+        path = os.path.join(self.output_dir, shard_name)
+        size = os.path.getsize(path) if os.path.exists(path) else None
+        cached = self.shard_members.get(shard_name)
+        # Shards are never rewritten, but another worker's open shard may have grown since
+        if cached is None or (member not in cached[1] and cached[0] != size):
+            cached = (size, self.read_members(path, size))
+            self.shard_members[shard_name] = cached
+        return member in cached[1]
+    
+    def read_members(self, path, size):
+        """Names of the complete members of a shard file of the given size, none if it is missing"""
+        if size is None:
+            return set()
+        if self.format == "zip":
+            # A zip cut short by a crash has no central directory and reads as nothing
+            if not zipfile.is_zipfile(path):
+                return set()
+            with zipfile.ZipFile(path) as archive:
+                return set(archive.namelist())
+        
+        names = set()
+        try:
+            with tarfile.open(path, "r:") as archive:
+                for info in archive:
+                    # A member whose data was cut short by a crash ends past the end of the file
+                    if info.offset_data + info.size <= size:
+                        names.add(info.name)
+        except tarfile.TarError:
+            pass  # Empty, or cut short inside the first header
+        return names
+    
+    def close(self):
+        """Finish the open shard"""
+        self.finish_shard()
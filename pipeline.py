@@ -0,0 +1,305 @@
+import argparse
+import hashlib
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from batch_processor import (BatchProcessor, add_job_arguments, collect_inputs, faces_to_json, job_options,
+                             output_stem)
+from buffer_pool import BufferPool
+from image_processor import ImageProcessor
+from output_sink import ShardSink
+
+
+# Marks the end of the stream on a stage queue
+END = object()
+
+# Seconds a blocked queue operation waits before checking whether the pipeline is stopping
+POLL_INTERVAL = 0.1
+
+
+def put_unless_stopped(stage_queue, item, stop):
+    """Put an item on a queue, giving up once stop is set; returns whether it was put"""
+    while not stop.is_set():
+        try:
+            stage_queue.put(item, timeout=POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+class Stage:
+    """One pipeline step: ``func`` takes a record dictionary and returns it updated
+    
+    ``workers`` threads run the step side by side and ``queue_size`` bounds the
+    records waiting in front of it, which is what applies backpressure to the
+    stages upstream.
+    """
+    
+    def __init__(self, name, func, workers=1, queue_size=4):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue_size = queue_size
+        self.count = 0
+        self.busy = 0.0
+
+
+class Pipeline:
+    """Stream records through stages connected by bounded queues.
+    
+    Every stage has its own worker threads, so decoding, detection, blurring and
+    encoding of different images overlap. cv2, numpy and MTCNN release the GIL in
+    their heavy calls, so this keeps several cores busy. A full queue blocks the
+    stage feeding it, so at most the queue sizes plus the workers' records are in
+    flight whatever the input length.
+    
+    A record that raises gets an ``error`` entry naming the stage, and later
+    stages pass it through untouched, as they do for records marked ``skip``.
+    Records come out in completion order; each keeps the ``index`` of its input.
+    """
+    
+    def __init__(self, stages):
+        self.stages = stages
+    
+    def run(self, items):
+        """Yield the finished record of every item, as {'index': i, 'input': item, ...}"""
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        queues.append(queue.Queue())
+        stop = threading.Event()
+        threads = []
+        
+        def feed():
+            for index, item in enumerate(items):
+                if not put_unless_stopped(queues[0], {'index': index, 'input': item}, stop):
+                    return
+            put_unless_stopped(queues[0], END, stop)
+        
+        for position, stage in enumerate(self.stages):
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for _ in range(stage.workers):
+                thread = threading.Thread(
+                    target=self.work, args=(stage, queues[position], queues[position + 1], remaining, lock, stop),
+                    daemon=True)
+                threads.append(thread)
+        
+        threads.append(threading.Thread(target=feed, daemon=True))
+        for thread in threads:
+            thread.start()
+        
+        try:
+            while True:
+                record = queues[-1].get()
+                if record is END:
+                    break
+                yield record
+        finally:
+            # A consumer that stops early must not leave threads blocked on their queues:
+            # every blocking get and put gives up within POLL_INTERVAL once stop is set
+            stop.set()
+    
+    @staticmethod
+    def work(stage, inbox, outbox, remaining, lock, stop):
+        """Worker loop of one stage; the last worker to see the end passes it on"""
+        while not stop.is_set():
+            try:
+                record = inbox.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if record is END:
+                inbox.put(END)  # Let the stage's other workers see it too
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    inbox.get()  # Take back the copy nobody else needs
+                    put_unless_stopped(outbox, END, stop)
+                return
+            
+            if 'error' not in record and not record.get('skip'):
+                start = time.perf_counter()
+                try:
+                    record = stage.func(record)
+                except Exception as e:
+                    record['error'] = f"{stage.name}: {e}"
+                elapsed = time.perf_counter() - start
+                record.setdefault('timings', {})[stage.name] = elapsed
+                with lock:
+                    stage.busy += elapsed
+                    stage.count += 1
+            if not put_unless_stopped(outbox, record, stop):
+                return
+    
+    def report(self):
+        """Per-stage record count and busy time, for sizing the workers"""
+        return "\n".join(f"{stage.name:<8} {stage.workers} worker(s) {stage.count:6d} records "
+                         f"{stage.busy:8.2f}s busy" for stage in self.stages)
+
+
+class FacePipeline:
+    """The batch job of BatchProcessor as overlapping pipeline stages.
+    
+    decode -> detect -> blur -> faces -> encode -> write. The BatchProcessor
+    supplies the configuration, the output parameters, the sink and the
+    manifest, so records, outputs and resuming are the same as a sequential
+    batch run. Detection uses the single detector one image at a time, blur
+    scratch buffers come from a pool per thread, and only the write stage
+    touches the sink and manifest.
+    """
+    
+    STAGES = ("decode", "detect", "blur", "faces", "encode", "write")
+    DEFAULT_WORKERS = {"decode": 2, "detect": 1, "blur": 2, "faces": 1, "encode": 2, "write": 1}
+    
+    def __init__(self, batch_processor, workers=None, queue_size=4):
+        self.batch = batch_processor
+        self.params = batch_processor.output_params()
+        self.local = threading.local()
+        self.detect_lock = threading.Lock()
+        workers = dict(self.DEFAULT_WORKERS, **(workers or {}))
+        # The sink and manifest are written in order by one thread
+        workers["detect"] = workers["write"] = 1
+        self.pipeline = Pipeline([Stage(name, getattr(self, name), workers[name], queue_size)
+                                  for name in self.STAGES])
+    
+    def pool(self):
+        """The calling thread's buffer pool"""
+        if not hasattr(self.local, "pool"):
+            self.local.pool = BufferPool()
+        return self.local.pool
+    
+    def decode(self, record):
+        """Read the file once for both the content hash and the decode, skipping finished inputs"""
+        input_path = record['input']
+        with open(input_path, "rb") as f:
+            data = f.read()
+        record['hash'] = hashlib.sha256(data).hexdigest()
+        previous = self.batch.manifest.latest(input_path)
+        record['todo'] = self.batch.outputs_to_compute(previous, record['hash'], self.params)
+        if not record['todo']:
+            record['skip'] = True
+            return record
+        
+        same_content = previous is not None and previous.get('hash') == record['hash']
+        record['previous'] = previous if same_content and previous.get('status') == 'ok' else None
+        record['faces'] = previous.get('faces') if same_content else None
+        record['image'] = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if record['image'] is None:
+            raise ValueError(f"Could not load image: {input_path}")
+        return record
+    
+    def detect(self, record):
+        """Run MTCNN when faces are needed and none are stored"""
+        if self.batch.needs_faces(record['todo']) and record['faces'] is None:
+            with self.detect_lock:
+                record['faces'] = faces_to_json(self.batch.get_face_detector().find_faces(record['image']))
+        return record
+    
+    def blur(self, record):
+        """Blur or mosaic the image at the configured stage"""
+        if 'blurred' in record['todo']:
+            record['blurred'] = ImageProcessor.apply_stage(
+                record['image'], self.batch.blur_stage, None if self.batch.blur_only else record['faces'],
+                pool=self.pool(),
+                memory_budget=self.batch.memory_budget)
+        return record
+    
+    def faces(self, record):
+        """Resample every face to every output size, one batch per size"""
+        if 'faces' in record['todo'] and record['faces']:
+            record['face_levels'] = self.batch.face_levels(record['image'], record['faces'])
+        record.pop('image')
+        return record
+    
+    def encode(self, record):
+        """JPEG-encode every output"""
+        stem = output_stem(record['input'])
+        encoded = {}
+        if 'blurred' in record['todo']:
+            encoded['blurred'] = [(f"{stem}_blurred.jpg", cv2.imencode(".jpg", record.pop('blurred'))[1].tobytes())]
+        if 'faces' in record['todo']:
+            encoded['faces'] = [(f"{stem}_face{i + 1}{suffix}.jpg", cv2.imencode(".jpg", face)[1].tobytes())
+                                for suffix, batch in record.pop('face_levels', [])
+                                for i, face in enumerate(batch)]
+        record['encoded'] = encoded
+        return record
+    
+    def write(self, record):
+        """Write the encoded outputs to the sink and append the manifest record"""
+        previous = record.pop('previous')
+        outputs = dict(previous.get('outputs', {})) if previous else {}
+        for name, members in record.pop('encoded').items():
+            paths = [self.batch.sink.write_encoded(member, data) for member, data in members]
+            outputs[name] = {'paths': paths, 'params': self.params[name]}
+        
+        faces = record['faces']
+        self.batch.sink.add_index({
+            'input': record['input'],
+            'outputs': {name: outputs[name]['paths'] for name in record['todo']},
+            'faces': [{'box': face['box'], 'confidence': face['confidence']} for face in faces or []]
+        })
+        self.batch.sink.flush()
+        self.batch.manifest.append({
+            'input': record['input'], 'hash': record['hash'], 'status': 'ok', 'outputs': outputs, 'faces': faces,
+            'timings': record['timings']
+        })
+        return record
+    
+    def run(self, input_paths):
+        """Process every input, recording failures so the next run retries them"""
+        counts = {'processed': 0, 'skipped': 0, 'failed': 0}
+        for record in self.pipeline.run(input_paths):
+            if 'error' in record:
+                counts['failed'] += 1
+                print(f"Failed {record['input']}: {record['error']}")
+                self.batch.manifest.append({
+                    'input': record['input'], 'hash': None, 'status': 'failed', 'error': record['error']})
+            elif record.get('skip'):
+                counts['skipped'] += 1
+                print(f"Skipping {record['input']}: already done")
+            else:
+                counts['processed'] += 1
+                print(f"Processed {record['input']}: {', '.join(record['todo'])}")
+        
+        print(f"Pipeline finished: {counts['processed']} processed, {counts['skipped']} skipped, "
+              f"{counts['failed']} failed")
+        print(self.pipeline.report())
+        return counts
+
+
+def parse_workers(text):
+    """Parse "decode=2,blur=4" into a stage -> worker count mapping"""
+    workers = {}
+    for item in filter(None, text.split(",")):
+        name, _, count = item.partition("=")
+        if name not in FacePipeline.STAGES:
+            raise argparse.ArgumentTypeError(f"Unknown stage: {name}")
+        workers[name] = int(count)
+    return workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch blur and face export with overlapping pipeline stages")
+    parser.add_argument("inputs", nargs="+", help="Image files or directories")
+    parser.add_argument("-o", "--output", required=True, help="Output directory")
+    add_job_arguments(parser)
+    parser.add_argument("--manifest", help="Manifest path (default: OUTPUT/manifest.jsonl)")
+    parser.add_argument("--workers", type=parse_workers, default={},
+                        help="Worker threads per stage, e.g. decode=2,blur=4,encode=2")
+    parser.add_argument("--queue-size", type=int, default=4, help="Records allowed to wait in front of each stage")
+    args = parser.parse_args()
+    
+    sink = ShardSink(args.output, args.archive, args.shard_size * 2 ** 20) if args.archive else None
+    batch = BatchProcessor(args.output, manifest_path=args.manifest, sink=sink, **job_options(args))
+    try:
+        FacePipeline(batch, args.workers, args.queue_size).run(collect_inputs(args.inputs))
+    finally:
+        batch.close()
+
+
+if __name__ == "__main__":
+    main()
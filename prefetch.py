@@ -0,0 +1,121 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+
+class PreparedImage:
+    """An image decoded, face-detected and blurred at one stage, ready to be shown"""
+    
+    def __init__(self, path, image=None, faces=None, blur_stage=None, blurred=None, error=None):
+        self.path = path
+        self.image = image
+        self.faces = faces or []
+        self.blur_stage = blur_stage
+        self.blurred = blurred
+        self.error = error
+    
+    @property
+    def nbytes(self):
+        """Bytes held by the decoded and blurred images"""
+        return sum(array.nbytes for array in (self.image, self.blurred) if array is not None)
+
+
+class ImagePrefetcher:
+    """Prepare the images following the current one of a folder on a background thread.
+    
+    ``prepare(path, blur_stage)`` turns a path into a PreparedImage and reports
+    failures through its ``error`` rather than raising. ``schedule``
+    queues the ``ahead`` images after an index on one worker thread, nearest
+    first; ``get`` returns an image straight from the cache, waits for it if it
+    is still being prepared, or prepares it on the calling thread if it was never
+    queued. ``get`` with ``wait=False`` never blocks: it queues the image if
+    needed and returns None until it is ready, for callers polling from the Tk
+    thread. Prepared images are kept in least-recently-used order and the oldest
+    are evicted once they hold more than ``memory_cap`` bytes; the image being
+    shown is never evicted, and nothing more is queued while the cache is full.
+    """
+    
+    def __init__(self, paths, prepare, ahead=3, memory_cap=768 * 2 ** 20):
+        self.paths = paths
+        self.prepare = prepare
+        self.ahead = ahead
+        self.memory_cap = memory_cap
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.futures = {}
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.current = None
+    
+    @property
+    def nbytes(self):
+        """Bytes held by the prepared images in the cache"""
+        return sum(prepared.nbytes for prepared in self.cache.values())
+    
+    def get(self, index, blur_stage, wait=True):
+        """The prepared image at index, making it the current one; without wait, None until it is ready"""
+        self.current = index
+        with self.lock:
+            self.harvest()
+            prepared = self.cache.get(index)
+            if prepared is None and not wait:
+                if index not in self.futures:
+                    self.futures[index] = self.executor.submit(self.prepare, self.paths[index], blur_stage)
+                return None
+            future = self.futures.pop(index, None)
+        
+        if prepared is None:
+            if future is not None:
+                prepared = future.result()
+            else:
+                prepared = self.prepare(self.paths[index], blur_stage)
+        
+        with self.lock:
+            self.cache[index] = prepared
+            self.cache.move_to_end(index)
+            self.evict()
+        return prepared
+    
+    def schedule(self, index, blur_stage):
+        """Queue the images after index that are neither cached nor queued"""
+        with self.lock:
+            self.harvest()
+            self.evict()
+            wanted = set(range(index + 1, min(index + 1 + self.ahead, len(self.paths))))
+            
+            # Work queued for images the user has moved away from is dropped
+            for queued in list(self.futures):
+                if queued not in wanted and queued != self.current and self.futures[queued].cancel():
+                    del self.futures[queued]
+            
+            for ahead_index in sorted(wanted):
+                if self.nbytes >= self.memory_cap:
+                    break
+                if ahead_index not in self.cache and ahead_index not in self.futures:
+                    self.futures[ahead_index] = self.executor.submit(
+                        self.prepare, self.paths[ahead_index], blur_stage)
+    
+    def harvest(self):
+        """Move finished background work into the cache"""
+        for index, future in list(self.futures.items()):
+            if future.done():
+                del self.futures[index]
+                if not future.cancelled():
+                    self.cache[index] = future.result()
+    
+    def evict(self):
+        """Drop least recently used images until the cache fits memory_cap"""
+        for index in list(self.cache):
+            if self.nbytes <= self.memory_cap:
+                break
+            if index != self.current:
+                del self.cache[index]
+    
+    def close(self):
+        """Drop queued work and the cache; a running preparation finishes in the background"""
+        with self.lock:
+            for future in self.futures.values():
+                future.cancel()
+            self.futures.clear()
+            self.cache.clear()
+        self.executor.shutdown(wait=False)
+
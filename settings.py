@@ -0,0 +1,42 @@
+# Shared defaults for the GUI and the headless tools
+
+# Anonymization stages - 3 blurs and a mosaic
+# "engine" selects the ImageProcessor.BLUR_ENGINES entry used for each blur stage.
+# "mode": "mosaic" stages pixelate instead, with about "blocks" blocks across each
+# face, over the face boxes or the whole image ("region"); their cost does not grow
+# with strength. The slider snaps to the stage with the nearest "slider_value".
+BLUR_STAGES = [
+    {"name": "Light Blur", "kernel": 25, "sigma": 10, "color": "#4CAF50", "slider_value": 0, "engine": "manual"},
+    {"name": "Medium Blur", "kernel": 55, "sigma": 25, "color": "#FF9800", "slider_value": 33, "engine": "manual"},
+    {"name": "Heavy Blur", "kernel": 101, "sigma": 50, "color": "#F44336", "slider_value": 67, "engine": "manual"},
+    {"name": "Mosaic", "mode": "mosaic", "blocks": 12, "region": "faces", "color": "#9C27B0", "slider_value": 100}
+]
+DEFAULT_BLUR_STAGE = 1
+
+# Derive a stage from an already blurred lower stage instead of the original. Faster,
+# but a cascaded stage may differ from the direct blur by up to
+# ImageProcessor.CASCADE_TOLERANCE grey levels, so the result depends on which
+# stages were shown first; off, every stage is blurred from the original.
+CASCADE_BLUR = False
+
+# Blur engine of the headless tools unless --engine says otherwise: the manual engine
+# is a per-pixel Python loop that holds the GIL and takes minutes per photo
+HEADLESS_BLUR_ENGINE = "fixed_point"
+
+# Image display settings
+IMAGE_DISPLAY_SIZE = (400, 400)
+FACE_DISPLAY_SIZE = (400, 400)
+
+# Working-memory budget for blur and resize scratch buffers, in MB. Operations whose
+# estimated footprint is larger run in row bands instead; None disables the check.
+MEMORY_BUDGET_MB = 512
+
+# Folder sessions prepare this many images after the current one in the background,
+# keeping prepared images within PREFETCH_MEMORY_MB
+PREFETCH_AHEAD = 3
+PREFETCH_MEMORY_MB = 768
+# Blur engine of the background preparation: the manual engine holds the GIL for
+# minutes per photo, which would stall the window while the next image is prepared
+PREFETCH_BLUR_ENGINE = "fixed_point"
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
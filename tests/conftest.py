@@ -0,0 +1,65 @@
+import cv2
+import numpy as np
+import pytest
+
+
+class FixedDetector:
+    """Stands in for FaceDetector with one face in the middle of every image"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def find_faces(self, image):
+        self.calls += 1
+        height, width = image.shape[:2]
+        return [{
+            'box': [width // 4, height // 4, width // 2, height // 2],
+            'confidence': 0.99,
+            'keypoints': {'left_eye': (width * 0.4, height * 0.4), 'right_eye': (width * 0.6, height * 0.4)}
+        }]
+
+
+class FakeRoot:
+    """Stands in for the Tk root: after() callbacks are collected and run by hand"""
+    
+    def __init__(self):
+        self.callbacks = {}
+        self.next_id = 0
+    
+    def after(self, delay_ms, callback):
+        self.next_id += 1
+        self.callbacks[self.next_id] = callback
+        return self.next_id
+    
+    def after_cancel(self, timer):
+        self.callbacks.pop(timer, None)
+    
+    def run_pending(self):
+        """Run the callbacks scheduled so far; those they schedule wait for the next call"""
+        callbacks, self.callbacks = self.callbacks, {}
+        for callback in callbacks.values():
+            callback()
+
+
+def smooth_image(height=96, width=128, seed=0):
+    """A smooth colour image, so perceptual hashes survive small changes"""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float64)
+    phase = rng.uniform(0, 6, 3)
+    channels = [127 + 100 * np.sin(xx / (9 + 3 * c) + phase[c]) * np.cos(yy / 11) for c in range(3)]
+    return np.clip(np.stack(channels, axis=-1), 0, 255).astype(np.uint8)
+
+
+@pytest.fixture
+def detector():
+    return FixedDetector()
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    """A folder of three small JPEGs"""
+    directory = tmp_path / "in"
+    directory.mkdir()
+    for i in range(3):
+        cv2.imwrite(str(directory / f"img{i}.jpg"), smooth_image(seed=i))
+    return directory
@@ -0,0 +1,118 @@
+import argparse
+import os
+
+import cv2
+
+from batch_processor import BatchProcessor, add_job_arguments, collect_inputs, job_options, output_stem
+from conftest import smooth_image
+from settings import BLUR_STAGES, HEADLESS_BLUR_ENGINE
+
+FAST_STAGE = dict(BLUR_STAGES[0], engine="fixed_point")
+
+
+def make_processor(output_dir, detector, **options):
+    options.setdefault('blur_stage', FAST_STAGE)
+    return BatchProcessor(str(output_dir), face_detector=detector, **options)
+
+
+def test_rerun_skips_finished_inputs(tmp_path, image_dir, detector):
+    processor = make_processor(tmp_path / "out", detector)
+    assert processor.run(collect_inputs([str(image_dir)])) == (3, 0, 0)
+    processor.close()
+    
+    processor = make_processor(tmp_path / "out", detector)
+    assert processor.run(collect_inputs([str(image_dir)])) == (0, 3, 0)
+    processor.close()
+    assert detector.calls == 3
+
+
+def test_changed_stage_reblurs_without_detecting(tmp_path, image_dir, detector):
+    processor = make_processor(tmp_path / "out", detector)
+    processor.run(collect_inputs([str(image_dir)]))
+    processor.close()
+    
+    processor = make_processor(tmp_path / "out", detector, blur_stage=dict(BLUR_STAGES[1], engine="fixed_point"))
+    assert processor.run(collect_inputs([str(image_dir)])) == (3, 0, 0)
+    record = processor.manifest.latest(str(image_dir / "img0.jpg"))
+    processor.close()
+    assert detector.calls == 3
+    assert set(record['timings']) == {'decode', 'blurred'}
+
+
+def test_missing_output_is_recomputed(tmp_path, image_dir, detector):
+    processor = make_processor(tmp_path / "out", detector)
+    processor.run(collect_inputs([str(image_dir)]))
+    processor.close()
+    os.remove(tmp_path / "out" / f"{output_stem(str(image_dir / 'img1.jpg'))}_face1.jpg")
+    
+    processor = make_processor(tmp_path / "out", detector)
+    assert processor.run(collect_inputs([str(image_dir)])) == (1, 2, 0)
+    processor.close()
+
+
+def test_failed_input_is_retried(tmp_path, image_dir, detector):
+    broken = image_dir / "broken.jpg"
+    broken.write_bytes(b"not an image")
+    processor = make_processor(tmp_path / "out", detector)
+    assert processor.run(collect_inputs([str(image_dir)])) == (3, 0, 1)
+    processor.close()
+    
+    processor = make_processor(tmp_path / "out", detector)
+    assert processor.run(collect_inputs([str(image_dir)])) == (0, 3, 1)
+    assert processor.manifest.latest(str(broken))['status'] == 'failed'
+    processor.close()
+
+
+def test_interrupted_manifest_line_is_ignored(tmp_path, image_dir, detector):
+    processor = make_processor(tmp_path / "out", detector)
+    processor.run(collect_inputs([str(image_dir)]))
+    processor.close()
+    with open(tmp_path / "out" / "manifest.jsonl", "a") as f:
+        f.write('{"input": "cut sho')
+    cv2.imwrite(str(image_dir / "img3.jpg"), smooth_image(seed=3))
+    
+    # The first record appended after the cut-short line must survive the next resume
+    processor = make_processor(tmp_path / "out", detector)
+    assert processor.run(collect_inputs([str(image_dir)])) == (1, 3, 0)
+    processor.close()
+    
+    processor = make_processor(tmp_path / "out", detector)
+    assert processor.run(collect_inputs([str(image_dir)])) == (0, 4, 0)
+    processor.close()
+
+
+def test_inputs_sharing_a_file_name_keep_their_own_outputs(tmp_path, detector):
+    inputs = [tmp_path / "a" / "IMG_1.jpg", tmp_path / "a" / "IMG_1.png", tmp_path / "b" / "IMG_1.jpg"]
+    for seed, path in enumerate(inputs):
+        path.parent.mkdir(exist_ok=True)
+        cv2.imwrite(str(path), smooth_image(seed=seed))
+    processor = make_processor(tmp_path / "out", detector)
+    assert processor.run([str(path) for path in inputs]) == (3, 0, 0)
+    records = [processor.manifest.latest(str(path)) for path in inputs]
+    processor.close()
+    
+    blurred = [record['outputs']['blurred']['paths'][0] for record in records]
+    assert len(set(blurred)) == 3
+    assert all(os.path.isabs(path) and os.path.exists(path) for path in blurred)
+
+
+def test_resume_from_another_directory_finds_the_outputs(tmp_path, image_dir, detector, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    processor = make_processor("out", detector)
+    processor.run(collect_inputs([str(image_dir)]))
+    processor.close()
+    
+    monkeypatch.chdir(image_dir)
+    processor = make_processor(tmp_path / "out", detector)
+    assert processor.run(collect_inputs([str(image_dir)])) == (0, 3, 0)
+    processor.close()
+
+
+def test_job_arguments_build_the_processor_options():
+    parser = argparse.ArgumentParser()
+    add_job_arguments(parser)
+    options = job_options(parser.parse_args(["--stage", "3", "--region", "image", "--memory-budget", "0",
+                                             "--pyramid", "112", "--face-size", "224"]))
+    assert options['blur_stage'] == dict(BLUR_STAGES[3], engine=HEADLESS_BLUR_ENGINE, region="image")
+    assert options['memory_budget'] is None
+    assert options['face_size'] == (224, 224) and options['face_pyramid'] == [(112, 112)]
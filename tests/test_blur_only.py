@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from batch_processor import BatchProcessor, collect_inputs, output_stem
+from image_processor import ImageProcessor
+from settings import BLUR_STAGES
+from watch_folder import WatchFolderDaemon
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_blur_only_run_never_imports_the_detector(tmp_path, image_dir):
+    script = (
+        "import sys\n"
+        "from batch_processor import BatchProcessor, collect_inputs\n"
+        f"processor = BatchProcessor({str(tmp_path / 'out')!r}, blur_only=True)\n"
+        f"assert processor.run(collect_inputs([{str(image_dir)!r}])) == (3, 0, 0)\n"
+        "processor.close()\n"
+        "print(sorted(name for name in ('mtcnn', 'face_detector', 'tensorflow') if name in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=REPO, capture_output=True, text=True, check=True)
+    assert result.stdout.splitlines()[-1] == "[]"
+    expected = [f"{output_stem(str(image_dir / f'img{i}.jpg'))}_blurred.jpg" for i in range(3)]
+    assert sorted(os.listdir(tmp_path / "out")) == sorted(expected + ["manifest.jsonl"])
+
+
+def test_blur_only_mosaic_covers_the_whole_image(tmp_path):
+    processor = BatchProcessor(str(tmp_path), BLUR_STAGES[3], blur_only=True)
+    assert processor.blur_stage['region'] == "image"
+    assert list(processor.output_params()) == ['blurred']
+    processor.close()
+
+
+def test_blur_only_ignores_stored_faces(tmp_path, image_dir, detector):
+    # A full mosaic run stores faces; a blur-only run must not size its blocks from them
+    stage = dict(BLUR_STAGES[3], region="image")
+    processor = BatchProcessor(str(tmp_path), stage, face_detector=detector)
+    processor.run(collect_inputs([str(image_dir)]))
+    processor.close()
+    
+    processor = BatchProcessor(str(tmp_path), stage, face_detector=detector, blur_only=True)
+    assert processor.run(collect_inputs([str(image_dir)])) == (3, 0, 0)
+    processor.close()
+    assert detector.calls == 3
+
+
+def test_watch_daemon_loads_no_detector_up_front(tmp_path):
+    daemon = WatchFolderDaemon(str(tmp_path), str(tmp_path / "out"), use_inotify=False, blur_only=True)
+    assert daemon.face_detector.face_detector is None
+    daemon.watcher.close()
+    daemon.manifest.close()
+
+
+def test_stage_without_faces_blurs_the_image():
+    image = np.random.default_rng(0).integers(0, 256, (40, 60, 3), dtype=np.uint8)
+    mosaic = ImageProcessor.apply_stage(image, dict(BLUR_STAGES[3], region="image"), None)
+    assert mosaic.shape == image.shape and not np.array_equal(mosaic, image)
+
+
+def test_gui_prepares_images_without_detecting(image_dir):
+    pytest.importorskip("tkinter")
+    import threading
+    from app_logic import FaceBlurAndScaleApp
+    
+    # The session's Tk root is not needed to prepare an image
+    app = object.__new__(FaceBlurAndScaleApp)
+    app.blur_only = True
+    app.face_detector = None
+    app.detect_lock = threading.Lock()
+    app.image_processor = ImageProcessor()
+    app.blur_stages = [dict(stage, engine="fixed_point") for stage in BLUR_STAGES]
+    app.memory_budget = None
+    
+    prepared = app.prepare_image(str(image_dir / "img0.jpg"), 0)
+    assert prepared.error is None and prepared.faces == []
+    assert prepared.blurred.shape == prepared.image.shape
+    assert app.face_detector is None
@@ -0,0 +1,29 @@
+import numpy as np
+
+from buffer_pool import BufferPool
+from image_processor import ImageProcessor
+
+
+def test_views_share_one_buffer_per_name():
+    pool = BufferPool()
+    large = pool.get("scratch", (10, 10, 3))
+    small = pool.get("scratch", (4, 5), np.uint16)
+    assert np.shares_memory(large, small)
+    assert small.shape == (4, 5) and small.dtype == np.uint16
+    assert pool.allocations == 1
+
+
+def test_loop_settles_at_zero_allocations():
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 256, (60 + i % 3, 80 - i % 2, 3), dtype=np.uint8) for i in range(12)]
+    pool = BufferPool()
+    counts = []
+    for image in images:
+        blurred = ImageProcessor.apply_gaussian_blur_fixed_point(
+            image, 9, 3, out=pool.get("blurred", image.shape), pool=pool)
+        ImageProcessor.resize_bicubic(blurred, (40, 30), engine="vectorized", out=pool.get("resized", (30, 40, 3)),
+                                      pool=pool)
+        counts.append(pool.allocations)
+    # Once every buffer has grown to the largest image, nothing more is allocated
+    assert counts[-1] == counts[3]
+    assert pool.nbytes > 0
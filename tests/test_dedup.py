@@ -0,0 +1,57 @@
+import os
+
+import cv2
+
+from conftest import smooth_image
+from dedup import HashIndex, dhash, scale_faces
+
+
+def test_dhash_survives_resize_and_reencode():
+    image = smooth_image(240, 320)
+    resized = cv2.resize(image, (160, 120), interpolation=cv2.INTER_AREA)
+    reencoded = cv2.imdecode(cv2.imencode(".jpg", resized, [cv2.IMWRITE_JPEG_QUALITY, 60])[1], cv2.IMREAD_COLOR)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    copy = cv2.cvtColor(reencoded, cv2.COLOR_BGR2GRAY)
+    assert bin(dhash(gray) ^ dhash(copy)).count("1") <= 4
+
+
+def test_index_finds_nearest_within_distance_and_persists(tmp_path):
+    path = str(tmp_path / "phash.jsonl")
+    index = HashIndex(path, max_distance=4)
+    index.add("a.jpg", 0b1111, (100, 50), [], {})
+    index.add("b.jpg", 0xFFFF_0000_0000_0000, (100, 50), [], {})
+    entry, distance = index.find(0b0111)
+    assert entry['input'].endswith("a.jpg") and distance == 1
+    assert index.find(0x0F0F_0F0F_0F0F_0F0F) is None
+    assert index.find(0b1111, exclude="a.jpg") is None
+    index.close()
+    
+    reloaded = HashIndex(path, max_distance=4)
+    assert reloaded.count == 2
+    assert reloaded.find(0xFFFF_0000_0000_0001)[0]['input'].endswith("b.jpg")
+    reloaded.close()
+
+
+def test_scale_faces_rescales_boxes_and_keypoints():
+    faces = [{'box': [10, 20, 30, 40], 'confidence': 0.9, 'keypoints': {'nose': [25, 40]}}]
+    scaled = scale_faces(faces, (100, 200), (50, 100))
+    assert scaled[0]['box'] == [5, 10, 15, 20]
+    assert scaled[0]['keypoints']['nose'] == [12.5, 20.0]
+
+
+def test_index_entry_after_a_cut_short_line_survives(tmp_path):
+    path = tmp_path / "phash.jsonl"
+    index = HashIndex(str(path))
+    index.add("a.jpg", 0x1, (100, 100), [], {})
+    index.close()
+    with open(path, "a") as f:
+        f.write('{"input": "b.jp')
+    
+    index = HashIndex(str(path))
+    index.add("c.jpg", 0xFF00, (100, 100), [], {})
+    index.close()
+    
+    index = HashIndex(str(path))
+    assert index.find(0xFF00)[0]['input'] == os.path.abspath("c.jpg")
+    assert index.count == 2
+    index.close()
@@ -0,0 +1,57 @@
+import threading
+import time
+
+from conftest import FakeRoot
+from event_scheduler import LatestWinsScheduler
+
+
+def run_until(root, condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        root.run_pending()
+        time.sleep(0.005)
+    assert condition()
+
+
+def test_superseded_requests_are_dropped():
+    root = FakeRoot()
+    release = threading.Event()
+    started, finished = [], []
+    
+    def work(request):
+        started.append(request)
+        release.wait(5)
+        return request * 10
+    
+    scheduler = LatestWinsScheduler(root, work, lambda request, result: finished.append((request, result)))
+    # A burst within the debounce delay leaves one timer and only the newest request
+    for request in (1, 2, 3):
+        scheduler.submit(request)
+    assert len(root.callbacks) == 1
+    run_until(root, lambda: started == [3])
+    
+    # Requests submitted while 3 runs replace each other; 3's result is dropped for the newest
+    scheduler.submit(4)
+    scheduler.submit(5)
+    root.run_pending()
+    release.set()
+    run_until(root, lambda: finished)
+    scheduler.shutdown()
+    assert started == [3, 5]
+    assert finished == [(5, 50)]
+
+
+def test_cancelled_result_never_reaches_done():
+    root = FakeRoot()
+    release = threading.Event()
+    finished = []
+    scheduler = LatestWinsScheduler(root, lambda request: release.wait(5),
+                                    lambda request, result: finished.append(request))
+    scheduler.submit(1)
+    run_until(root, lambda: scheduler.running is not None)
+    scheduler.cancel()
+    assert not scheduler.busy
+    release.set()
+    root.run_pending()
+    scheduler.shutdown()
+    assert finished == []
@@ -0,0 +1,18 @@
+import numpy as np
+
+from conftest import FixedDetector, smooth_image
+from face_detector import FaceDetector
+from image_processor import ImageProcessor
+
+
+def test_face_pyramid_levels_are_derived_from_the_level_above():
+    image = smooth_image(200, 240)
+    face = FixedDetector().find_faces(image)[0]
+    faces = [face, dict(face, box=[10, 20, 60, 80])]
+    # Sizes in any order come back in that order
+    small, large, middle = FaceDetector.extract_face_pyramid(image, faces, [(21, 21), (64, 64), (32, 32)])
+    
+    assert large.shape == (2, 64, 64, 3) and middle.shape == (2, 32, 32, 3) and small.shape == (2, 21, 21, 3)
+    assert np.array_equal(large, FaceDetector.extract_faces_fused(image, faces, (64, 64)))
+    assert np.array_equal(middle, ImageProcessor.decimate_area(large, 2))
+    assert np.array_equal(small, ImageProcessor.resize_bicubic_separable(middle, (21, 21)))
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import conformance
+from image_processor import ImageProcessor
+
+
+def test_fixed_point_blur_keeps_flat_images_flat():
+    # Products overflowed a uint16 loop under NumPy 1.x value-based casting
+    for value in (0, 128, 255):
+        image = np.full((30, 40, 3), value, dtype=np.uint8)
+        assert np.all(ImageProcessor.apply_gaussian_blur_fixed_point(image, 25, 10) == value)
+
+
+def test_batch_chunks_do_not_change_results():
+    images = np.random.default_rng(0).integers(0, 256, (5, 24, 32, 3), dtype=np.uint8)
+    for batch_api in (ImageProcessor.resize_batch, ImageProcessor.letterbox_batch):
+        whole = batch_api(images, (20, 10))
+        assert np.array_equal(whole, batch_api(images, (20, 10), max_batch_pixels=1))
+    assert np.array_equal(ImageProcessor.blur_batch(images, 7, 2),
+                          ImageProcessor.blur_batch(images, 7, 2, max_batch_pixels=1))
+
+
+@pytest.mark.parametrize("engine", ["fixed_point", "manual"])
+def test_banded_blur_matches_the_whole_image_blur(engine):
+    image = np.random.default_rng(1).integers(0, 256, (23, 17, 3), dtype=np.uint8)
+    whole = ImageProcessor.apply_gaussian_blur(image, 7, 2, engine=engine)
+    assert ImageProcessor.estimate_blur_bytes(image.shape, 7, engine) > 1
+    # A one-byte budget forces one-row bands
+    banded = ImageProcessor.apply_gaussian_blur(image, 7, 2, engine=engine, memory_budget=1)
+    assert np.array_equal(banded, whole)
+
+
+def test_banded_resize_matches_the_whole_image_resize():
+    image = np.random.default_rng(2).integers(0, 256, (31, 29, 3), dtype=np.uint8)
+    whole = ImageProcessor.resize_bicubic(image, (45, 20), engine="vectorized")
+    banded = ImageProcessor.resize_bicubic(image, (45, 20), engine="vectorized", memory_budget=1)
+    assert np.array_equal(banded, whole)
+
+
+def test_pixelate_averages_every_block_including_cut_off_ones():
+    image = np.random.default_rng(3).integers(0, 256, (7, 10, 3), dtype=np.uint8)
+    result = ImageProcessor.pixelate(image, 3)
+    for top in range(0, 7, 3):
+        for left in range(0, 10, 3):
+            block = image[top:top + 3, left:left + 3].reshape(-1, 3)
+            mean = (block.sum(axis=0) + len(block) // 2) // len(block)
+            assert np.all(result[top:top + 3, left:left + 3] == mean)
+
+
+def test_mosaic_clips_boxes_that_cross_the_image_edge():
+    image = np.random.default_rng(4).integers(0, 256, (40, 48, 3), dtype=np.uint8)
+    boxes = [(-6, -4, 20, 16), (36, 30, 24, 24)]
+    result = ImageProcessor.apply_mosaic(image, 4, boxes)
+    
+    expected = image.copy()
+    expected[0:12, 0:14] = ImageProcessor.pixelate(image[0:12, 0:14], ImageProcessor.mosaic_block_size(20, 16, 4))
+    expected[30:40, 36:48] = ImageProcessor.pixelate(image[30:40, 36:48], ImageProcessor.mosaic_block_size(24, 24, 4))
+    assert np.array_equal(result, expected)
+    
+    # A box entirely outside the image changes nothing, and region "image" covers everything
+    assert np.array_equal(ImageProcessor.apply_mosaic(image, 4, [(60, 50, 10, 10)]), image)
+    whole = ImageProcessor.apply_mosaic(image, 4, boxes, region="image")
+    assert np.array_equal(whole, ImageProcessor.pixelate(image, ImageProcessor.mosaic_block_size(24, 24, 4)))
+
+
+@pytest.mark.parametrize("engine", ["fixed_point", "sweep"])
+def test_blur_engines_conform(engine):
+    assert conformance.run([engine], []) == []
+
+
+def test_resize_and_batch_apis_conform():
+    assert conformance.run([], sorted(ImageProcessor.RESIZE_ENGINES)) == []
@@ -0,0 +1,67 @@
+import json
+import os
+import tarfile
+import zipfile
+
+import numpy as np
+import pytest
+
+from output_sink import ShardSink
+
+NOISE = np.random.default_rng(0).integers(0, 256, (64, 64, 3), dtype=np.uint8)
+
+
+def read_index(path, format):
+    if format == "tar":
+        with tarfile.open(path) as archive:
+            return json.load(archive.extractfile("index.json"))
+    with zipfile.ZipFile(path) as archive:
+        return json.loads(archive.read("index.json"))
+
+
+@pytest.mark.parametrize("format", ShardSink.FORMATS)
+def test_shard_index_lists_every_input(tmp_path, format):
+    sink = ShardSink(str(tmp_path), format)
+    for i in range(3):
+        reference = sink.write(f"img{i}_blurred.jpg", NOISE)
+        sink.add_index({'input': f"img{i}.jpg", 'outputs': {'blurred': [reference]}, 'faces': []})
+    sink.close()
+    
+    index = read_index(tmp_path / f"shard-w00-00000.{format}", format)
+    assert index['shard'] == f"shard-w00-00000.{format}"
+    assert [record['input'] for record in index['records']] == ["img0.jpg", "img1.jpg", "img2.jpg"]
+
+
+def test_shards_roll_over_and_never_reopen(tmp_path):
+    sink = ShardSink(str(tmp_path), "tar", max_shard_bytes=1)
+    references = [sink.write(f"img{i}.jpg", NOISE) for i in range(3)]
+    sink.close()
+    assert [reference.split(":")[0] for reference in references] == [
+        "shard-w00-00000.tar", "shard-w00-00001.tar", "shard-w00-00002.tar"]
+    assert ShardSink(str(tmp_path), "tar").sequence == 3
+
+
+def test_exists_needs_the_member_complete_on_disk(tmp_path):
+    sink = ShardSink(str(tmp_path), "tar")
+    first = sink.write("first.jpg", NOISE)
+    second = sink.write("second.jpg", NOISE)
+    sink.flush()
+    assert sink.exists(first) and sink.exists(second)
+    assert not sink.exists(first.replace("first", "never_written"))
+    
+    # A crash cuts the shard short inside the second member
+    path = tmp_path / first.split(":")[0]
+    os.truncate(path, os.path.getsize(path) - 600)  # Past the 512-byte block padding
+    resumed = ShardSink(str(tmp_path), "tar")
+    assert resumed.exists(first)
+    assert not resumed.exists(second)
+
+
+def test_unfinished_zip_shard_holds_nothing(tmp_path):
+    sink = ShardSink(str(tmp_path), "zip")
+    reference = sink.write("img.jpg", NOISE)
+    sink.flush()
+    # No central directory until the shard is closed
+    assert not ShardSink(str(tmp_path), "zip", worker_id=1).exists(reference)
+    sink.close()
+    assert ShardSink(str(tmp_path), "zip", worker_id=1).exists(reference)
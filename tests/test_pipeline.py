@@ -0,0 +1,50 @@
+import threading
+import time
+
+from batch_processor import BatchProcessor, collect_inputs
+from pipeline import FacePipeline, Pipeline, Stage
+from settings import BLUR_STAGES
+
+
+def test_records_pass_every_stage_and_errors_are_kept():
+    def double(record):
+        record['value'] = record['input'] * 2
+        return record
+    
+    def reject_odd(record):
+        if record['input'] % 2:
+            raise ValueError("odd")
+        return record
+    
+    pipeline = Pipeline([Stage("double", double, workers=2), Stage("check", reject_odd)])
+    records = sorted(pipeline.run(range(10)), key=lambda record: record['index'])
+    assert [record['value'] for record in records] == [i * 2 for i in range(10)]
+    assert [record['index'] for record in records if 'error' in record] == [1, 3, 5, 7, 9]
+    assert records[1]['error'] == "check: odd"
+
+
+def test_consumer_stopping_early_releases_the_workers():
+    def slow(record):
+        time.sleep(0.001)
+        return record
+    
+    before = threading.active_count()
+    pipeline = Pipeline([Stage("a", slow, workers=2, queue_size=1), Stage("b", slow, queue_size=1)])
+    for record in pipeline.run(range(1000)):
+        break
+    
+    deadline = time.time() + 5
+    while threading.active_count() > before and time.time() < deadline:
+        time.sleep(0.01)
+    assert threading.active_count() == before
+
+
+def test_face_pipeline_matches_the_batch_run_and_resumes(tmp_path, image_dir, detector):
+    stage = dict(BLUR_STAGES[0], engine="fixed_point")
+    batch = BatchProcessor(str(tmp_path / "out"), stage, face_detector=detector)
+    assert FacePipeline(batch).run(collect_inputs([str(image_dir)])) == {'processed': 3, 'skipped': 0, 'failed': 0}
+    batch.close()
+    
+    batch = BatchProcessor(str(tmp_path / "out"), stage, face_detector=detector)
+    assert batch.run(collect_inputs([str(image_dir)])) == (0, 3, 0)
+    batch.close()
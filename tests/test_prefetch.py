@@ -0,0 +1,115 @@
+import threading
+
+import numpy as np
+import pytest
+
+from conftest import FakeRoot
+from prefetch import ImagePrefetcher, PreparedImage
+
+MB = 2 ** 20
+
+
+class Preparer:
+    """Prepares 1 MB images and records which paths it was asked for"""
+    
+    def __init__(self):
+        self.prepared = []
+        self.lock = threading.Lock()
+    
+    def __call__(self, path, blur_stage):
+        with self.lock:
+            self.prepared.append(path)
+        return PreparedImage(path, np.zeros(MB, dtype=np.uint8), blur_stage=blur_stage)
+
+
+def wait_for_queue(prefetcher):
+    for future in list(prefetcher.futures.values()):
+        future.result()
+
+
+def test_schedule_prepares_the_following_images_once():
+    preparer = Preparer()
+    prefetcher = ImagePrefetcher([f"img{i}" for i in range(10)], preparer, ahead=3, memory_cap=100 * MB)
+    prefetcher.get(0, 1)
+    prefetcher.schedule(0, 1)
+    wait_for_queue(prefetcher)
+    assert prefetcher.get(1, 1).path == "img1"
+    prefetcher.schedule(1, 1)
+    wait_for_queue(prefetcher)
+    prefetcher.close()
+    assert sorted(preparer.prepared) == ["img0", "img1", "img2", "img3", "img4"]
+
+
+def test_eviction_keeps_the_memory_cap_and_the_current_image():
+    preparer = Preparer()
+    prefetcher = ImagePrefetcher([f"img{i}" for i in range(10)], preparer, ahead=3, memory_cap=2 * MB)
+    for index in range(5):
+        prefetcher.get(index, 0)
+        assert prefetcher.nbytes <= 2 * MB
+        assert index in prefetcher.cache
+    # Least recently used first: the two newest survive
+    assert list(prefetcher.cache) == [3, 4]
+    prefetcher.close()
+
+
+def test_full_cache_queues_nothing_more():
+    preparer = Preparer()
+    prefetcher = ImagePrefetcher([f"img{i}" for i in range(10)], preparer, ahead=3, memory_cap=MB)
+    prefetcher.get(0, 0)
+    prefetcher.schedule(0, 0)
+    assert prefetcher.futures == {}
+    prefetcher.close()
+
+
+def test_failures_are_returned_not_raised():
+    prefetcher = ImagePrefetcher(["missing"], lambda path, stage: PreparedImage(path, error="Could not load image!"))
+    assert prefetcher.get(0, 0).error == "Could not load image!"
+    prefetcher.close()
+
+
+def test_get_without_wait_never_blocks_and_keeps_the_image_queued():
+    release = threading.Event()
+    
+    def prepare(path, blur_stage):
+        release.wait(5)
+        return PreparedImage(path, np.zeros(MB, dtype=np.uint8), blur_stage=blur_stage)
+    
+    prefetcher = ImagePrefetcher(["img0", "img1", "img2"], prepare, ahead=1, memory_cap=100 * MB)
+    assert prefetcher.get(2, 0, wait=False) is None
+    prefetcher.schedule(2, 0)
+    assert 2 in prefetcher.futures
+    release.set()
+    wait_for_queue(prefetcher)
+    assert prefetcher.get(2, 0, wait=False).path == "img2"
+    prefetcher.close()
+
+
+def test_paging_polls_for_the_next_image_instead_of_blocking():
+    pytest.importorskip("tkinter")
+    from app_logic import FaceBlurAndScaleApp
+    
+    release = threading.Event()
+    
+    def prepare(path, blur_stage):
+        release.wait(5)
+        return PreparedImage(path, np.zeros(16, dtype=np.uint8), blur_stage=blur_stage)
+    
+    # The session's Tk window is replaced by a fake root and stubbed panes
+    app = object.__new__(FaceBlurAndScaleApp)
+    app.root = FakeRoot()
+    app.prefetcher = ImagePrefetcher(["img0", "img1", "img2"], prepare, ahead=1, memory_cap=100 * MB)
+    app.folder_index, app.folder_target, app.folder_step, app.folder_poll, app.folder_poll_ms = 0, None, 1, None, 30
+    app.current_blur_stage = 0
+    shown, labels = [], []
+    app.show_prepared = lambda prepared, quiet=False: shown.append(prepared.path) or True
+    app.rebuild_main_window = lambda: None
+    app.update_folder_label = lambda index, loading=False: labels.append((index, loading))
+    
+    app.navigate_images("next")
+    assert shown == [] and labels == [(1, True)] and app.root.callbacks
+    release.set()
+    for future in list(app.prefetcher.futures.values()):
+        future.result()
+    app.root.run_pending()
+    assert shown == ["img1"] and app.folder_index == 1 and app.folder_target is None
+    app.prefetcher.close()
@@ -0,0 +1,33 @@
+import numpy as np
+
+from image_processor import ImageProcessor
+from tile_pyramid import TilePyramid
+
+
+def noise(height, width, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def test_render_matches_a_direct_decimation():
+    image = noise(600, 700)
+    pyramid = TilePyramid(image, tile_size=128)
+    out = np.empty((100, 120, 3), dtype=np.uint8)
+    # At zoom 1/4 the view reads level 2 one pixel per display pixel, starting at (28, 25)
+    pyramid.render(0.25, (352, 300), out)
+    expected = ImageProcessor.decimate_area(image, 4)[25:125, 28:148, ::-1]
+    assert np.array_equal(out, expected)
+    # Only the two level-2 tiles under the view were built
+    assert set(pyramid.tiles) == {(2, 0, 0), (2, 0, 1)}
+
+
+def test_render_at_full_size_and_outside_the_image():
+    image = noise(300, 200, seed=1)
+    pyramid = TilePyramid(image, tile_size=64)
+    out = np.empty((40, 50, 3), dtype=np.uint8)
+    pyramid.render(1.0, (25, 20), out)
+    assert np.array_equal(out, image[:40, :50, ::-1])
+    
+    # A view hanging over the top-left corner is black where it leaves the image
+    pyramid.render(1.0, (10, 5), out)
+    assert not out[:15].any() and not out[:, :15].any()
+    assert np.array_equal(out[15:, 15:], image[:25, :35, ::-1])
@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+
+import pytest
+
+from batch_processor import output_stem
+from settings import BLUR_STAGES
+from watch_folder import InotifyWatcher, PollingWatcher, WatchFolderDaemon
+
+
+def test_polling_watcher_reports_files_once_stable(tmp_path):
+    watcher = PollingWatcher(str(tmp_path), interval=0.01)
+    path = tmp_path / "a.jpg"
+    path.write_bytes(b"partial")
+    assert watcher.events(0) == []
+    assert watcher.events(0) == [str(path)]
+    assert watcher.events(0) == []
+    
+    # Rewritten files are reported again once they settle
+    path.write_bytes(b"partial, now complete")
+    assert watcher.events(0) == []
+    assert watcher.events(0) == [str(path)]
+
+
+def test_polling_watcher_ignores_other_files(tmp_path):
+    watcher = PollingWatcher(str(tmp_path), interval=0.01)
+    (tmp_path / "notes.txt").write_text("not an image")
+    watcher.events(0)
+    assert watcher.events(0) == []
+
+
+@pytest.mark.skipif(not InotifyWatcher.available(), reason="needs Linux inotify")
+def test_inotify_watcher_reports_closed_and_moved_files(tmp_path):
+    watched = tmp_path / "watched"
+    watched.mkdir()
+    watcher = InotifyWatcher(str(watched))
+    try:
+        (watched / "written.jpg").write_bytes(b"data")
+        (tmp_path / "moved.jpg").write_bytes(b"data")
+        os.rename(tmp_path / "moved.jpg", watched / "moved.jpg")
+        
+        paths = []
+        deadline = time.time() + 5
+        while len(paths) < 2 and time.time() < deadline:
+            paths += watcher.events(timeout=0.5)
+        assert sorted(paths) == [str(watched / "moved.jpg"), str(watched / "written.jpg")]
+    finally:
+        watcher.close()
+
+
+def test_daemon_processes_backlog_and_stops(tmp_path, image_dir, detector):
+    output = tmp_path / "out"
+    daemon = WatchFolderDaemon(str(image_dir), str(output), workers=2, use_inotify=False, interval=0.05,
+                               face_detector=detector, blur_stage=dict(BLUR_STAGES[0], engine="fixed_point"))
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    deadline = time.time() + 20
+    while len(os.listdir(output)) < 7 and time.time() < deadline:
+        time.sleep(0.05)
+    daemon.stop()
+    thread.join(timeout=10)
+    
+    assert not thread.is_alive()
+    stems = [output_stem(str(image_dir / f"img{i}.jpg")) for i in range(3)]
+    assert sorted(os.listdir(output)) == sorted(
+        ["manifest.jsonl"] + [f"{stem}_{kind}.jpg" for stem in stems for kind in ("blurred", "face1")])
+
+
+def test_file_is_not_queued_again_while_it_is_processed(tmp_path, image_dir):
+    daemon = WatchFolderDaemon(str(image_dir), str(tmp_path / "out"), use_inotify=False)
+    path = str(image_dir / "img0.jpg")
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    
+    class SlowProcessor:
+        def process_safely(self, input_path):
+            calls.append(input_path)
+            started.set()
+            release.wait(5)
+        
+        def close(self):
+            pass
+    
+    thread = threading.Thread(target=daemon.worker, args=(0, lambda worker_id: SlowProcessor()), daemon=True)
+    thread.start()
+    try:
+        daemon.enqueue(path)
+        assert started.wait(5)
+        daemon.enqueue(path)
+        daemon.enqueue(path)
+        assert daemon.queue.qsize() == 0
+        
+        # The events seen while it was processed queue it once more afterwards
+        release.set()
+        deadline = time.time() + 5
+        while len(calls) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        release.set()
+        daemon.queue.put(None)
+        thread.join(timeout=5)
+        daemon.watcher.close()
+        daemon.manifest.close()
+    assert calls == [path, path]
+
+
+def test_output_directory_must_differ_from_the_watched_one(image_dir):
+    with pytest.raises(ValueError):
+        WatchFolderDaemon(str(image_dir), str(image_dir) + "/.", use_inotify=False)
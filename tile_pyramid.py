@@ -0,0 +1,85 @@
+import math
+import numpy as np
+
+from image_processor import ImageProcessor
+
+
+class TilePyramid:
+    """Lazily built multi-resolution tile pyramid (mipmaps) of a BGR image.
+    
+    Level 0 is the image itself and level L is 2**L times smaller. Levels are never
+    built as a whole: a tile is produced the first time a view touches it, by area
+    decimation of just the source region it covers, and is cached in RGB order.
+    Panning and zooming therefore only pay for tiles that become visible, whatever
+    the size of the source.
+    """
+    
+    def __init__(self, image, tile_size=256):
+        self.image = image
+        self.tile_size = tile_size
+        self.tiles = {}
+        
+        longest = max(image.shape[:2])
+        self.max_level = max(0, int(math.ceil(math.log2(longest / tile_size)))) if longest > tile_size else 0
+    
+    def level_shape(self, level):
+        """Height and width of a pyramid level"""
+        factor = 2 ** level
+        return self.image.shape[0] // factor, self.image.shape[1] // factor
+    
+    def level_for_zoom(self, zoom):
+        """Coarsest level that still has at least one level pixel per display pixel"""
+        if zoom >= 1:
+            return 0
+        return min(self.max_level, int(math.floor(math.log2(1 / zoom))))
+    
+    def tile(self, level, row, col):
+        """Return the RGB tile at (row, col) of a level, converting it on first use"""
+        key = (level, row, col)
+        tile = self.tiles.get(key)
+        if tile is None:
+            factor = 2 ** level
+            span = self.tile_size * factor
+            region = self.image[row * span:(row + 1) * span, col * span:(col + 1) * span]
+            if factor > 1:
+                region = ImageProcessor.decimate_area(region, factor)
+            tile = np.ascontiguousarray(region[:, :, ::-1])
+            self.tiles[key] = tile
+        return tile
+    
+    def render(self, zoom, center, out):
+        """Render the view of ``out``'s size centred on ``center`` at ``zoom`` display pixels per source pixel
+        
+        Display pixels are mapped to the nearest level pixel, and only tiles that
+        intersect the view are read. Areas outside the image are left black.
+        """
+        view_h, view_w = out.shape[:2]
+        level = self.level_for_zoom(zoom)
+        level_h, level_w = self.level_shape(level)
+        level_scale = 2.0 ** -level
+        step = level_scale / zoom
+        
+        xs = np.floor(center[0] * level_scale + (np.arange(view_w) - view_w / 2 + 0.5) * step).astype(np.intp)
+        ys = np.floor(center[1] * level_scale + (np.arange(view_h) - view_h / 2 + 0.5) * step).astype(np.intp)
+        
+        out.fill(0)
+        size = self.tile_size
+        valid_x = np.flatnonzero((xs >= 0) & (xs < level_w))
+        valid_y = np.flatnonzero((ys >= 0) & (ys < level_h))
+        if len(valid_x) == 0 or len(valid_y) == 0:
+            return out
+        
+        for row in range(ys[valid_y[0]] // size, ys[valid_y[-1]] // size + 1):
+            out_rows = valid_y[ys[valid_y] // size == row]
+            if len(out_rows) == 0:
+                continue
+            for col in range(xs[valid_x[0]] // size, xs[valid_x[-1]] // size + 1):
+                out_cols = valid_x[xs[valid_x] // size == col]
+                if len(out_cols) == 0:
+                    continue
+                tile = self.tile(level, row, col)
+                local_y = ys[out_rows] - row * size
+                local_x = xs[out_cols] - col * size
+                out[out_rows[0]:out_rows[-1] + 1, out_cols[0]:out_cols[-1] + 1] = tile[np.ix_(local_y, local_x)]
+        
+        return out
@@ -0,0 +1,310 @@
+import argparse
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import threading
+import time
+
+from batch_processor import BatchProcessor, add_job_arguments, job_options
+from manifest import BatchManifest
+from output_sink import ShardSink
+from settings import IMAGE_EXTENSIONS
+
+
+class InotifyWatcher:
+    """Report files in a directory once their writer has finished, using Linux inotify
+    
+    IN_CLOSE_WRITE fires when a writer closes the file and IN_MOVED_TO when a
+    finished file is renamed into the directory, so no size polling is needed.
+    ``events`` blocks in select, so an idle watcher uses no CPU.
+    """
+    
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_Q_OVERFLOW = 0x00004000
+    IN_CLOEXEC = 0o2000000
+    EVENT_HEADER = struct.Struct("iIII")
+    
+    def __init__(self, directory):
+        self.directory = directory
+        self.libc = self.load_libc()
+        self.fd = self.libc.inotify_init1(self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO
+        if self.libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"Cannot watch {directory}")
+    
+    @staticmethod
+    def load_libc():
+        """The C library, if it exposes inotify"""
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1  # Raises AttributeError where inotify is missing
+        return libc
+    
+    @classmethod
+    def available(cls):
+        """True on systems with inotify"""
+        try:
+            cls.load_libc()
+            return True
+        except (OSError, AttributeError):
+            return False
+    
+    def backlog(self, settle=1.0):
+        """Files already in the directory whose size and mtime do not change over settle seconds
+        
+        Files still being written are left out; their IN_CLOSE_WRITE reports them.
+        """
+        before = {path: file_signature(path) for path in list_images(self.directory)}
+        time.sleep(settle)
+        return [path for path, signature in before.items()
+                if signature is not None and file_signature(path) == signature]
+    
+    def events(self, timeout):
+        """Paths of files completed since the last call, waiting up to timeout seconds for one"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        
+        data = os.read(self.fd, 64 * 1024)
+        paths = []
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                # Events were lost: fall back to listing the directory
+                paths.extend(list_images(self.directory))
+            elif name:
+                paths.append(os.path.join(self.directory, os.fsdecode(name)))
+        return paths
+    
+    def close(self):
+        """Stop watching"""
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Report files in a directory once their size and modification time stop changing
+    
+    A file is complete when two scans ``interval`` seconds apart see the same
+    size and mtime. Used where inotify is unavailable, such as network mounts
+    and non-Linux systems. ``interval`` must exceed the longest pause of a
+    writer; a file picked up too early fails to decode, is recorded as failed and
+    is processed again once it changes.
+    """
+    
+    def __init__(self, directory, interval=1.0):
+        self.directory = directory
+        self.interval = interval
+        self.pending = {}
+        self.reported = {}
+    
+    def backlog(self):
+        """Nothing: the first two scans report the files already present"""
+        return []
+    
+    def events(self, timeout):
+        """Paths of files that became stable since the last call"""
+        time.sleep(min(timeout, self.interval))
+        paths = []
+        seen = {}
+        for path in list_images(self.directory):
+            signature = file_signature(path)
+            if signature is None:
+                continue  # Removed between listing and stat
+            seen[path] = signature
+            if self.reported.get(path) == signature:
+                continue
+            if self.pending.get(path) == signature and signature[0] > 0:
+                self.reported[path] = signature
+                paths.append(path)
+        self.pending = seen
+        self.reported = {path: signature for path, signature in self.reported.items() if path in seen}
+        return paths
+    
+    def close(self):
+        """Nothing to release"""
+
+
+def file_signature(path):
+    """(size, mtime) of a file, or None if it is gone"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def list_images(directory):
+    """Image files directly inside a directory, sorted by name"""
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.lower().endswith(IMAGE_EXTENSIONS)]
+
+
+class SharedDetector:
+    """One FaceDetector used by several worker threads, one detection at a time
+    
+    Without a detector one is created by the first detection, so daemons
+    whose outputs need no faces never load MTCNN.
+    """
+    
+    def __init__(self, face_detector=None):
+        self.face_detector = face_detector
+        self.lock = threading.Lock()
+    
+    def find_faces(self, image):
+        """Run the shared detector under its lock"""
+        with self.lock:
+            if self.face_detector is None:
+                from face_detector import FaceDetector
+                self.face_detector = FaceDetector()
+            return self.face_detector.find_faces(image)
+
+
+class WatchFolderDaemon:
+    """Process images dropped into a directory until stopped.
+    
+    The detector is loaded once, by the first detection, and shared by ``workers`` threads.
+    Each thread owns a BatchProcessor with its own buffer pool and output sink
+    and runs for the daemon's lifetime. With the fixed-point engine, the default of
+    the command line, the blur's numpy passes release the GIL, so blurs run in
+    parallel while MTCNN runs one image at a time. Files already
+    in the directory are picked up at start. Every result, or failure, is
+    appended to the shared BatchManifest, which also lets a restarted daemon
+    skip files it has already processed.
+    
+    A file stays marked from the moment it is queued until its processing has
+    finished, so two workers never process it at once; an event arriving while
+    it is being processed queues it once more afterwards. The output directory
+    must not be the watched one, or the daemon would process its own outputs.
+    """
+    
+    def __init__(self, directory, output_dir, workers=2, use_inotify=None, interval=1.0, face_detector=None,
+                 **processor_options):
+        if os.path.realpath(output_dir) == os.path.realpath(directory):
+            raise ValueError("The output directory must not be the watched directory")
+        self.directory = directory
+        self.output_dir = output_dir
+        self.workers = workers
+        self.processor_options = processor_options
+        if use_inotify is None:
+            use_inotify = InotifyWatcher.available()
+        self.watcher = InotifyWatcher(directory) if use_inotify else PollingWatcher(directory, interval)
+        
+        self.face_detector = SharedDetector(face_detector)
+        os.makedirs(output_dir, exist_ok=True)
+        self.manifest = BatchManifest(os.path.join(output_dir, "manifest.jsonl"))
+        
+        self.queue = queue.Queue()
+        self.queued = set()
+        self.processing = set()
+        self.changed = set()
+        self.queued_lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.threads = []
+    
+    def enqueue(self, path):
+        """Queue a file unless it is already waiting; one being processed is queued again once it is done"""
+        with self.queued_lock:
+            if path in self.processing:
+                self.changed.add(path)
+                return
+            if path in self.queued:
+                return
+            self.queued.add(path)
+        self.queue.put(path)
+    
+    def worker(self, worker_id, processor_factory):
+        """Process queued files until a None sentinel arrives"""
+        processor = processor_factory(worker_id)
+        try:
+            while True:
+                path = self.queue.get()
+                if path is None:
+                    break
+                with self.queued_lock:
+                    self.queued.discard(path)
+                    self.processing.add(path)
+                try:
+                    if os.path.exists(path):
+                        processor.process_safely(path)
+                finally:
+                    with self.queued_lock:
+                        self.processing.discard(path)
+                        changed = path in self.changed
+                        self.changed.discard(path)
+                if changed:
+                    self.enqueue(path)
+        finally:
+            processor.close()
+    
+    def make_processor(self, worker_id):
+        """A BatchProcessor for one worker thread, sharing the detector and manifest"""
+        options = dict(self.processor_options)
+        archive = options.pop('archive', None)
+        shard_bytes = options.pop('shard_bytes', 1 << 30)
+        sink = ShardSink(self.output_dir, archive, shard_bytes, worker_id) if archive else None
+        return BatchProcessor(self.output_dir, face_detector=self.face_detector, manifest=self.manifest,
+                              sink=sink, **options)
+    
+    def run(self):
+        """Watch and process until stop() is called or the process is interrupted"""
+        for worker_id in range(self.workers):
+            thread = threading.Thread(target=self.worker, args=(worker_id, self.make_processor), daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        
+        for path in self.watcher.backlog():
+            self.enqueue(path)
+        print(f"Watching {self.directory} with {type(self.watcher).__name__} and {self.workers} worker(s)")
+        
+        try:
+            while not self.stopping.is_set():
+                for path in self.watcher.events(timeout=1.0):
+                    if path.lower().endswith(IMAGE_EXTENSIONS):
+                        self.enqueue(path)
+        except KeyboardInterrupt:
+            print("Stopping after the queued files")
+        finally:
+            self.shutdown()
+    
+    def stop(self):
+        """Ask run() to return once the queued files are done"""
+        self.stopping.set()
+    
+    def shutdown(self):
+        """Let the workers drain the queue, then close the watcher and manifest"""
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.watcher.close()
+        self.manifest.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blur images and export faces as they arrive in a folder")
+    parser.add_argument("directory", help="Directory to watch")
+    parser.add_argument("-o", "--output", required=True, help="Output directory")
+    parser.add_argument("--workers", type=int, default=2, help="Worker threads")
+    parser.add_argument("--poll", action="store_true", help="Poll the directory instead of using inotify")
+    parser.add_argument("--interval", type=float, default=1.0, help="Polling interval in seconds")
+    add_job_arguments(parser, "Stream outputs into tar or zip shards, one per worker, instead of loose files")
+    args = parser.parse_args()
+    
+    daemon = WatchFolderDaemon(args.directory, args.output, args.workers, use_inotify=False if args.poll else None,
+                               interval=args.interval, archive=args.archive, shard_bytes=args.shard_size * 2 ** 20,
+                               **job_options(args))
+    daemon.run()
+
+
+if __name__ == "__main__":
+    main()